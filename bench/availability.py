@@ -0,0 +1,72 @@
+"""Availability parsing cost with and without the phrase cache.
+
+    python -m bench.availability --entries 100000
+
+Entries are drawn from a small set of common phrasings with random spacing and
+case, like real TimeModal input; the cached run shares parse_phrase results, the
+uncached run calls the parser underneath the cache for every entry.
+"""
+import argparse
+import random
+import time
+
+from models.Availability import AvailabilityWindow, parse_availability, parse_phrase
+
+PHRASES = [
+    "now", "asap", "7PM to 9PM EST", "7-9pm", "after 8", "after 9 est", "8pm pst", "10-2", "until 11",
+    "19:00-21:00 UTC", "from 7:30pm to 11pm", "around 9ish", "9pm cet", "whenever", "now - 11",
+]
+
+
+def make_entries(count: int, rng):
+    entries = []
+    for _ in range(count):
+        phrase = rng.choice(PHRASES)
+        entries.append(phrase.upper() if rng.random() < 0.2 else phrase + " " * rng.randint(0, 1))
+    return entries
+
+
+def run(entries, parse):
+    started = time.perf_counter()
+    for text in entries:
+        parse(" ".join(text.lower().split()))
+    return time.perf_counter() - started
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    entries = make_entries(args.entries, rng)
+
+    uncached = run(entries, parse_phrase.__wrapped__)
+    parse_phrase.cache_clear()
+    cached = run(entries, parse_phrase)
+    info = parse_phrase.cache_info()
+
+    now = time.time()
+    started = time.perf_counter()
+    groups = 0
+    for start in range(0, len(entries) - 4, 5):
+        window = AvailabilityWindow()
+        for user_id, text in enumerate(entries[start:start + 5]):
+            interval = parse_availability(text, now)
+            if interval is not None:
+                window.add(user_id, interval)
+        window.remove(0)
+        groups += 1
+    windows = time.perf_counter() - started
+
+    print(f"📊 {args.entries} availability entries, {len(PHRASES)} phrasings")
+    print(f"  parse uncached   {uncached / args.entries * 1e6:8.2f} µs/entry")
+    print(f"  parse cached     {cached / args.entries * 1e6:8.2f} µs/entry ({uncached / cached:.1f}x, {info.hits} hits / {info.misses} misses)")
+    print(f"  group windows    {windows / groups * 1e6:8.2f} µs/group (5 joins + 1 leave, parse + time zone resolution)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Availability parsing benchmark")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
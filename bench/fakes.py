@@ -0,0 +1,260 @@
+"""In-process stand-ins for the discord.py objects the handlers touch.
+
+Every call that would hit Discord's REST API goes through FakeREST, which adds
+latency, answers a share of requests with 429 (retried after `retry_after`, the
+way discord.py does) and counts calls per route. With a RestScheduler attached,
+bot-token calls wait for it first, like they do behind the patched HTTPClient.
+"""
+import asyncio
+import itertools
+import random
+from types import SimpleNamespace
+
+import discord
+
+
+# snowflakes from "now", so bulk delete treats fake messages as young
+_snowflakes = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+
+
+def next_id():
+    return next(_snowflakes)
+
+
+# fake route -> discord.py route template; interaction and webhook routes aren't scheduled
+_ROUTE_PATHS = {
+    ("POST", "channels/messages"): "/channels/{channel_id}/messages",
+    ("PATCH", "channels/messages"): "/channels/{channel_id}/messages/{message_id}",
+    ("DELETE", "channels/messages"): "/channels/{channel_id}/messages/{message_id}",
+    ("POST", "channels/messages/bulk-delete"): "/channels/{channel_id}/messages/bulk-delete",
+}
+
+
+class FakeREST:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.5, rate_limit_chance: float = 0.0, retry_after: float = 0.25, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter  # +/- share of latency
+        self.rate_limit_chance = rate_limit_chance
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls = {}  # (method, route) -> requests sent, retries included
+        self.rate_limited = {}  # (method, route) -> 429 responses
+        self.metrics = None  # bot Metrics, so /metrics counters match a live run
+        self.scheduler = None  # RestScheduler, when the run enables one
+
+    def _delay(self):
+        if not self.latency:
+            return 0
+        return self.latency * (1 + self.random.uniform(-self.jitter, self.jitter))
+
+    async def request(self, method: str, route: str, major=None):
+        key = (method, route)
+        resource = route.split("/", 1)[0]
+        path = _ROUTE_PATHS.get(key)
+        if self.scheduler is not None and path is not None:
+            await self.scheduler.acquire(method, path, str(major))
+        while True:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            await asyncio.sleep(self._delay())
+            if self.rate_limit_chance and self.random.random() < self.rate_limit_chance:
+                self.rate_limited[key] = self.rate_limited.get(key, 0) + 1
+                if self.metrics is not None:
+                    self.metrics.rest_requests.inc(method=method, resource=resource, status=429)
+                    self.metrics.rest_rate_limited.inc(method=method, resource=resource)
+                await asyncio.sleep(self.retry_after)
+                continue
+            if self.metrics is not None:
+                self.metrics.rest_requests.inc(method=method, resource=resource, status=200)
+            return
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+def _serialize(embed=None, view=None):
+    # discord.py serializes the payload on every send/edit; keep that cost in the numbers
+    if embed is not None:
+        embed.to_dict()
+    if view is not None:
+        view.to_components()
+
+
+class FakeUser:
+    def __init__(self, name: str = "player"):
+        self.id = next_id()
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.bot = False
+
+
+# the bot's own account; set as the client user in bench.load_test.start_bot
+BOT_USER = FakeUser("FiveStack")
+BOT_USER.bot = True
+
+
+class FakeRole:
+    def __init__(self, name: str):
+        self.id = next_id()
+        self.name = name
+        self.mention = f"<@&{self.id}>"
+
+
+class FakeMessage:
+    def __init__(self, rest: FakeREST, channel, content=None, embed=None, view=None, author=None):
+        self.rest = rest
+        self.id = next_id()
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.author = author
+
+    async def edit(self, **kwargs):
+        _serialize(kwargs.get("embed"), kwargs.get("view"))
+        await self.rest.request("PATCH", "channels/messages", self.channel.id)
+        for key in ("content", "embed", "view"):
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+        return self
+
+    async def delete(self):
+        await self.rest.request("DELETE", "channels/messages", self.channel.id)
+
+
+class FakeWebhookMessage(FakeMessage):
+    async def edit(self, **kwargs):
+        _serialize(kwargs.get("embed"), kwargs.get("view"))
+        await self.rest.request("PATCH", "webhooks/messages")
+        return self
+
+
+# channel_id -> FakeChannel, for get_partial_messageable
+CHANNELS = {}
+
+
+def get_partial_messageable(channel_id: int, guild_id: int = None, type=None):
+    # stands in for Client.get_partial_messageable: groups only keep IDs and edit through partial messages
+    return CHANNELS[channel_id]
+
+
+class FakeChannel:
+    def __init__(self, rest: FakeREST, guild, name: str = "lfg"):
+        self.rest = rest
+        self.id = next_id()
+        CHANNELS[self.id] = self
+        self.guild = guild
+        self.name = name
+        self.messages = []  # what the bot posted here
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        _serialize(embed, view)
+        await self.rest.request("POST", "channels/messages", self.id)
+        message = FakeMessage(self.rest, self, content, embed, view, author=self.guild.me)
+        self.messages.append(message)
+        return message
+
+    def get_partial_message(self, message_id: int):
+        message = FakeMessage(self.rest, self, author=self.guild.me)
+        message.id = message_id
+        return message
+
+    def permissions_for(self, member):
+        return SimpleNamespace(manage_messages=True, read_message_history=True)
+
+    async def delete_messages(self, messages):
+        if len(messages) > 1:
+            await self.rest.request("POST", "channels/messages/bulk-delete", self.id)
+        else:
+            await self.rest.request("DELETE", "channels/messages", self.id)
+
+    async def history(self, limit=100, after=None, **kwargs):
+        for message in self.messages[-limit:]:
+            if after is None or message.id > after.id:
+                yield message
+
+
+class FakeGuild:
+    def __init__(self, rest: FakeREST, name: str = "guild", ping_role: bool = True):
+        self.id = next_id()
+        self.name = name
+        self.me = BOT_USER
+        self.roles = [FakeRole("league-of-legends")] if ping_role else []
+        self.emojis = []
+        self.text_channels = [FakeChannel(rest, self)]
+
+    def get_channel(self, channel_id: int):
+        return next((channel for channel in self.text_channels if channel.id == channel_id), None)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+        self.kind = None  # first response method used
+        self.kwargs = {}
+        self.modal = None
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self, kind: str, route: str, **kwargs):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        self._done = True
+        self.kind = kind
+        self.kwargs = kwargs
+        _serialize(kwargs.get("embed"), kwargs.get("view"))
+        await self._interaction.rest.request("POST", route)
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond("send_message", "interactions/callback", content=content, **kwargs)
+
+    async def edit_message(self, **kwargs):
+        await self._respond("edit_message", "interactions/callback", **kwargs)
+
+    async def defer(self, **kwargs):
+        await self._respond("defer", "interactions/callback", **kwargs)
+
+    async def send_modal(self, modal):
+        self.modal = modal
+        await self._respond("send_modal", "interactions/callback")
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self.kwargs = {}  # last followup sent
+
+    async def send(self, content=None, wait: bool = False, **kwargs):
+        self.kwargs = dict(kwargs, content=content)
+        _serialize(kwargs.get("embed"), kwargs.get("view"))
+        await self._interaction.rest.request("POST", "webhooks/messages")
+        return FakeWebhookMessage(self._interaction.rest, self._interaction.channel, content) if wait else None
+
+
+class FakeInteraction:
+    def __init__(self, rest: FakeREST, guild: FakeGuild, channel: FakeChannel, user: FakeUser, message=None):
+        self.rest = rest
+        self.id = next_id()
+        self.created_at = discord.utils.utcnow()
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.user = user
+        self.message = message
+        self.type = discord.InteractionType.component
+        self.data = {}
+        self._cs_response = FakeResponse(self)  # same slot discord.py caches Interaction.response in
+        self.followup = FakeFollowup(self)
+
+    @property
+    def response(self):
+        return self._cs_response
+
+    async def edit_original_response(self, **kwargs):
+        _serialize(kwargs.get("embed"), kwargs.get("view"))
+        await self.rest.request("PATCH", "webhooks/messages/@original")
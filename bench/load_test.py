@@ -0,0 +1,299 @@
+"""Offline load test: drives every UI component and Session command across many simulated guilds.
+
+    python -m bench.load_test --guilds 2000 --concurrency 500 --latency 0.05 --rate-limit 0.01
+
+Each guild runs one full group lifecycle: session-status, fivestack, six players racing
+through Join -> RoleSelect -> TimeModal for five slots, Leave and re-join, Reset,
+Close, reset-fivestack and cleanup-messages. No Discord connection is needed; REST
+calls go to bench.fakes.FakeREST.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import discord
+
+ROLES = ["Top", "Jungle", "Mid", "ADC", "Support", "Fill"]
+
+
+def configure_environment(args):
+    """Point every state file at a scratch directory before config is imported"""
+    workdir = tempfile.mkdtemp(prefix="fivestack-bench-")
+    os.environ.update({
+        "SESSION_DATA_FILE": os.path.join(workdir, "session_data.json"),
+        "SESSION_JOURNAL_FILE": os.path.join(workdir, "session_journal.jsonl"),
+        "MESSAGE_LEDGER_FILE": os.path.join(workdir, "message_ledger.jsonl"),
+        "NOTIFY_QUEUE_FILE": os.path.join(workdir, "notify_queue.jsonl"),
+        "CLEANUP_STATE_FILE": os.path.join(workdir, "cleanup_watermarks.json"),
+        "GROUP_STATE_SQLITE_PATH": os.path.join(workdir, "group_state.db"),
+        "COMMAND_HASH_FILE": os.path.join(workdir, "command_tree_hash.json"),
+        "GROUP_STATE_BACKEND": args.backend,
+        "EDIT_COALESCE_WINDOW": str(args.edit_window),
+        "REST_GLOBAL_RATE": str(args.global_rate),
+        "INTERACTION_DEFER_BUDGET": str(args.defer_budget),
+        "METRICS_PORT": "0",
+        "CLUSTER_COUNT": "1",
+        "STARTUP_PROFILE": "false",
+    })
+    return workdir
+
+
+def percentile(samples, q: float):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class LoadTest:
+    def __init__(self, instance, rest, seed: int = 0):
+        self.instance = instance
+        self.rest = rest
+        self.random = random.Random(seed)
+        self.cog = instance.bot.get_cog("Session")
+        from models.GroupRouterView import GroupRouterView
+        # the buttons of every group message, registered once by the Session cog
+        self.router = next(view for view in instance.bot.persistent_views if isinstance(view, GroupRouterView))
+        self.samples = {}  # handler -> [seconds]
+        self.errors = {}  # handler -> exceptions that escaped
+
+    async def _timed(self, name: str, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        finally:
+            self.samples.setdefault(name, []).append(time.perf_counter() - started)
+
+    def _interaction(self, guild, user, message=None, channel=None):
+        from bench.fakes import FakeInteraction
+        return FakeInteraction(self.rest, guild, channel or guild.text_channels[0], user, message)
+
+    async def command(self, name: str, guild, user, **options):
+        interaction = self._interaction(guild, user)
+        command = self.cog.session_group.get_command(name)
+        await self._timed(name, command.callback(self.cog, interaction, **options))
+        return interaction
+
+    async def component(self, view, custom_id: str, guild, user):
+        if isinstance(view, discord.ui.View):
+            items, message = view.children, None
+        else:
+            # groups are plain objects; their buttons live on the router view, which finds the group by message ID
+            items, message = self.router.children, view.partial_message()
+        item = next(item for item in items if getattr(item, "custom_id", None) == custom_id)
+        interaction = self._interaction(guild, user, message)
+        await self._timed(custom_id, item.callback(interaction))
+        return interaction
+
+    async def join(self, view, guild, user):
+        """Join -> RoleSelect -> TimeModal, as one player clicking through"""
+        interaction = await self.component(view, "join_slot_button", guild, user)
+        # a deferred Join answers with a followup instead
+        role_view = interaction.response.kwargs.get("view") or interaction.followup.kwargs.get("view")
+        if role_view is None:  # full or already joined
+            return
+        modal = await self.select_role(role_view, guild, user, self.random.choice(ROLES))
+        if modal is not None:
+            await self.submit_time(modal, guild, user, self.random.choice(["", "now", "7PM to 9PM EST"]))
+
+    @staticmethod
+    def role_select(role_view):
+        """The RoleSelect in an ephemeral role menu, or None"""
+        from ui.RoleSelect import RoleSelect
+        return next((item for item in role_view.children if isinstance(item, RoleSelect)), None)
+
+    async def select_role(self, role_view, guild, user, role: str):
+        """Pick a role in the ephemeral RoleSelect; returns the TimeModal it opened"""
+        from ui.RoleSelect import RoleSelect
+        interaction = self._interaction(guild, user)
+        # resolved from the custom_id alone, like discord.py's dynamic item dispatch
+        custom_id = self.role_select(role_view).custom_id
+        match = RoleSelect.__discord_ui_compiled_template__.fullmatch(custom_id)
+        select = await RoleSelect.from_custom_id(interaction, None, match)
+        select._refresh_state(interaction, {"custom_id": custom_id, "values": [role]})
+        await self._timed("role_select", select.callback(interaction))
+        return interaction.response.modal
+
+    async def submit_time(self, modal, guild, user, value: str):
+        interaction = self._interaction(guild, user)
+        interaction.type = discord.InteractionType.modal_submit
+        interaction.data = {
+            "custom_id": modal.custom_id,
+            "components": [{"type": 1, "components": [{"type": 4, "custom_id": modal.time_input.custom_id, "value": value}]}],
+        }
+        # through the Session cog's listener, which rebuilds the modal from its custom_id
+        await self._timed("time_modal", self.cog.on_interaction(interaction))
+
+    async def run_guild(self, guild):
+        from bench.fakes import FakeUser
+        creator = FakeUser("creator")
+        players = [creator] + [FakeUser(f"player{i}") for i in range(5)]
+
+        await self.command("session-status", guild, creator)
+        await self.command("fivestack", guild, creator)
+        groups = self.instance.groups.in_channel(guild.id, guild.text_channels[0].id)
+        if not groups:
+            return
+        view = groups[-1]
+
+        # six players race for five slots
+        await asyncio.gather(*(self.join(view, guild, user) for user in players))
+        await self.component(view, "leave_button", guild, players[1])
+        await self.join(view, guild, players[1])
+        await self.component(view, "reset_button", guild, creator)
+        await self.join(view, guild, players[2])
+        await self.command("session-status", guild, creator)
+        await self.component(view, "close_button", guild, creator)
+        await self.command("reset-fivestack", guild, creator)
+        await self.command("cleanup-messages", guild, creator)
+
+    async def run(self, guilds, concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(guild):
+            async with semaphore:
+                await self.run_guild(guild)
+
+        await asyncio.gather(*(bounded(guild) for guild in guilds))
+
+
+def summarize(test, rest, elapsed):
+    handled = sum(len(samples) for samples in test.samples.values())
+    return {
+        "elapsed": round(elapsed, 3),
+        "handlers_per_second": round(handled / elapsed, 1) if elapsed else 0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "handlers": {
+            name: {"count": len(samples), "p50_ms": round(percentile(samples, 0.5) * 1000, 2),
+                   "p99_ms": round(percentile(samples, 0.99) * 1000, 2), "errors": test.errors.get(name, 0)}
+            for name, samples in test.samples.items()
+        },
+        "rest_calls": rest.total,
+        "rest_429s": sum(rest.rate_limited.values()),
+    }
+
+
+def report(header, test, rest, instance, elapsed, rss_before, json_path=None, extra=None):
+    handled = sum(len(samples) for samples in test.samples.values())
+    print(f"\n📊 {header}")
+    print(f"  wall time     {elapsed:8.2f}s")
+    print(f"  throughput    {handled / elapsed:8.1f} handlers/s ({handled} handlers)")
+    print(f"  peak RSS      {peak_rss_mb():8.1f} MB (+{peak_rss_mb() - rss_before:.1f} MB during the run)")
+
+    deferred = {}
+    for (kind, name), count in instance.metrics.interactions_deferred.values.items():
+        deferred[name] = deferred.get(name, 0) + count
+    print(f"\n  {'handler':<20} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7} {'deferred':>9}")
+    for name, samples in sorted(test.samples.items()):
+        print(f"  {name:<20} {len(samples):>7} {percentile(samples, 0.5) * 1000:>9.1f} "
+              f"{percentile(samples, 0.99) * 1000:>9.1f} {max(samples) * 1000:>9.1f} {test.errors.get(name, 0):>7} {deferred.get(name, 0):>9}")
+
+    print(f"\n  {'REST route':<42} {'calls':>7} {'429s':>6}")
+    for (method, route), calls in sorted(rest.calls.items(), key=lambda item: -item[1]):
+        print(f"  {method + ' ' + route:<42} {calls:>7} {rest.rate_limited.get((method, route), 0):>6}")
+    print(f"  {'total':<42} {rest.total:>7} {sum(rest.rate_limited.values()):>6}")
+
+    coalescer = instance.edit_coalescer
+    print(f"\n  group edits   requested {coalescer.requested}, coalesced {coalescer.coalesced}, "
+          f"sent {coalescer.sent}, unchanged {coalescer.unchanged}, failed {coalescer.failed}")
+    notifier = instance.notifier
+    print(f"  notifications sent {notifier.sent}, retried {notifier.retried}, failed {notifier.failed}, still queued {len(notifier)}")
+    scheduler = instance.rest_scheduler
+    if scheduler is not None:
+        from bot.RestScheduler import CLASS_NAMES
+        print(f"\n  {'REST class':<20} {'calls':>7} {'waited':>7} {'mean wait ms':>13}")
+        for i, name in enumerate(CLASS_NAMES):
+            series = scheduler.wait_histogram.series.get((name,))
+            mean = series[-2] / series[-1] * 1000 if series else 0
+            print(f"  {name:<20} {scheduler.scheduled[i]:>7} {scheduler.delayed[i]:>7} {mean:>13.1f}")
+
+    if json_path:
+        summary = dict(extra or {}, **summarize(test, rest, elapsed))
+        with open(json_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+async def start_bot(args):
+    """A FiveStack instance with the Session cog loaded and a fake REST layer attached"""
+    if args.backend == "redis":
+        url = args.redis_url
+        if url is None:
+            from bench.redis_stub import RedisStub
+            url = await RedisStub().start()  # served by this event loop until the run ends
+        os.environ["GROUP_STATE_REDIS_URL"] = url  # config isn't imported yet
+    from bot import FiveStack, set_bot
+    from bench.fakes import BOT_USER, FakeREST, get_partial_messageable
+
+    rest = FakeREST(latency=args.latency, rate_limit_chance=args.rate_limit, retry_after=args.retry_after, seed=args.seed)
+    instance = FiveStack()
+    set_bot(instance)
+    instance.bot._connection.user = BOT_USER  # cleanup compares message authors against bot.user
+    instance.bot.get_partial_messageable = get_partial_messageable
+    rest.metrics = instance.metrics
+    rest.scheduler = instance.rest_scheduler
+    await instance.load_cogs()
+    await instance.start_background_tasks()
+    await instance.lifecycle.start()  # started by on_ready in the bot
+    await instance.notifier.start()
+    return instance, rest
+
+
+async def main(args):
+    configure_environment(args)
+    rss_before = peak_rss_mb()
+    instance, rest = await start_bot(args)
+
+    from bench.fakes import FakeGuild
+    guilds = [FakeGuild(rest, name=f"guild{i}") for i in range(args.guilds)]
+    test = LoadTest(instance, rest, seed=args.seed)
+    started = time.perf_counter()
+    try:
+        await test.run(guilds, args.concurrency)
+        elapsed = time.perf_counter() - started
+    finally:
+        await instance.stop_background_tasks()
+
+    header = (f"{args.guilds} guilds ({args.guilds / elapsed:.1f} lifecycles/s), concurrency {args.concurrency}, "
+              f"REST latency {args.latency * 1000:.0f}ms, 429 chance {args.rate_limit:.1%}, backend {args.backend}")
+    extra = {"guilds": args.guilds, "concurrency": args.concurrency, "latency": args.latency,
+             "rate_limit": args.rate_limit, "backend": args.backend}
+    report(header, test, rest, instance, elapsed, rss_before, args.json, extra)
+
+
+def add_common_args(parser):
+    parser.add_argument("--latency", type=float, default=0.05, help="mean fake REST latency in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of REST calls answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.25, help="retry_after of injected 429s in seconds")
+    parser.add_argument("--edit-window", type=float, default=1.0, help="EDIT_COALESCE_WINDOW for the run")
+    parser.add_argument("--defer-budget", type=float, default=2.0, help="INTERACTION_DEFER_BUDGET for the run (lower it to exercise auto-deferral)")
+    parser.add_argument("--global-rate", type=float, default=0, help="REST_GLOBAL_RATE for the run (0 = no REST scheduler)")
+    parser.add_argument("--backend", default="memory", choices=["memory", "sqlite", "redis"], help="group state backend")
+    parser.add_argument("--redis-url", help="Redis server for --backend redis (default: an in-process bench.redis_stub)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="append a JSON summary line to this file")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline FiveStack load test")
+    parser.add_argument("--guilds", type=int, default=2000, help="simulated guilds, each running one group lifecycle")
+    parser.add_argument("--concurrency", type=int, default=500, help="guilds in flight at once")
+    add_common_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,79 @@
+"""Matchmaking pass cost and quality on large role queues.
+
+    python -m bench.matchmaking --sizes 1000,10000,100000
+
+For each queue size builds a random FIFO queue with a skewed role mix (plenty of
+Mids, few Junglers and Supports) and times bot.Matchmaker.form_stacks. Quality is
+compared with filling groups in queue order (what Join + get_first_available_slot
+does): consecutive blocks of five that happen to cover every lane.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from bot.Matchmaker import LANES, form_stacks, max_stacks
+from models.Slot import Role, Slot
+
+# share of the queue picking each role
+ROLE_MIX = {Role.TOP: 0.15, Role.JUNGLE: 0.10, Role.MID: 0.30, Role.ADC: 0.20, Role.SUPPORT: 0.10, Role.FILL: 0.15}
+
+
+def make_queue(size: int, rng):
+    roles = rng.choices(list(ROLE_MIX), weights=list(ROLE_MIX.values()), k=size)
+    return [Slot(1_000_000_000_000_000 + i, f"player{i}", None, role) for i, role in enumerate(roles)]
+
+
+def fifo_stacks(queue):
+    """Complete groups from seating players in queue order, five at a time"""
+    complete = 0
+    for start in range(0, len(queue) - 4, 5):
+        block = queue[start:start + 5]
+        counts = [sum(1 for slot in block if slot.role == lane) for lane in LANES]
+        if max_stacks(counts, sum(1 for slot in block if slot.role == Role.FILL)) == 1:
+            complete += 1
+    return complete
+
+
+def check(queue, stacks, leftover):
+    """Every player seated at most once, in their lane unless they queued as Fill"""
+    roles = {slot.user_id: slot.role for slot in queue}
+    seen = set()
+    for stack in stacks:
+        assert tuple(slot.role for slot in stack) == LANES
+        for slot in stack:
+            assert slot.user_id not in seen
+            assert roles[slot.user_id] in (slot.role, Role.FILL)
+            seen.add(slot.user_id)
+    assert len(seen) + len(leftover) == len(queue)
+    # optimal: the leftover can't form one more group
+    counts = [sum(1 for slot in leftover if slot.role == lane) for lane in LANES]
+    assert max_stacks(counts, sum(1 for slot in leftover if slot.role not in LANES)) == 0
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    print(f"📊 form_stacks, role mix {', '.join(f'{role.label} {share:.0%}' for role, share in ROLE_MIX.items())}")
+    print(f"  {'queued':>8} {'p50 ms':>9} {'max ms':>9} {'groups':>7} {'in order':>9} {'matched':>8}")
+    for size in args.sizes:
+        queue = make_queue(size, rng)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            stacks, leftover = form_stacks(queue)
+            timings.append(time.perf_counter() - started)
+        check(queue, stacks, leftover)
+        print(f"  {size:>8} {statistics.median(timings) * 1000:>9.2f} {max(timings) * 1000:>9.2f} "
+              f"{len(stacks):>7} {fifo_stacks(queue):>9} {1 - len(leftover) / size:>8.0%}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Matchmaking benchmark")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[100, 1000, 5000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
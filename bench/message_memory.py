@@ -0,0 +1,114 @@
+"""Memory held by message references: discord.py's message cache and what each group keeps of its message.
+
+    python -m bench.message_memory --messages 20000 --groups 5000
+
+MESSAGE_CREATE payloads go through ConnectionState.parse_message_create (the
+path gateway events take) once per max_messages setting: discord.py's default
+of 1000, a small cache and none at all. Groups are measured holding the full
+discord.Message of their post, as FiveManView.original_message did, against
+the (channel_id, message_id) pair they keep now and edit through partial messages.
+"""
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+import discord
+
+from bench.fakes import next_id
+from models.GroupRouterView import GroupRouterView
+
+GUILD_ID = next_id()
+CHANNEL_ID = next_id()
+CHATTERS = 200  # distinct authors; discord.py caches each User once, whatever max_messages is
+
+
+def author(i: int):
+    return {"id": str(1_000_000_000_000_000 + i), "username": f"player{i}", "discriminator": "0", "global_name": f"Player {i}", "avatar": None}
+
+
+def chat_payload(i: int):
+    # everyday channel traffic: every message in a guild the bot can see lands in the cache
+    return {
+        "id": str(next_id()), "channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID), "type": 0,
+        "content": f"anyone up for a game after {i % 12 + 1}? need a support and a jungler",
+        "author": author(i % CHATTERS), "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False},
+        "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None, "tts": False, "mention_everyone": False,
+        "mentions": [], "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "components": [],
+    }
+
+
+def group_payload(i: int, components):
+    # a group post: ping, progress embed with five players and the router buttons
+    embed = discord.Embed(title="🎉 5 MAN GROUP - FULL! ✅✅✅✅✅ 5/5", color=discord.Color.green())
+    embed.description = "**Joined Players:**\n" + "\n".join(f"<@{1_000_000_000_000_000 + i + k}> - Mid - 7PM to 9PM EST" for k in range(5))
+    embed.add_field(name="Remaining Slots", value="0")
+    embed.set_footer(text="Click Join to take a slot")
+    payload = chat_payload(i)
+    payload.update(content="@league-of-legends – New FiveStack group forming! 🎮", embeds=[embed.to_dict()], components=components)
+    return payload
+
+
+def retained(build):
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, after - before
+
+
+def measure_cache(max_messages, count: int):
+    client = discord.Client(intents=discord.Intents.default(), max_messages=max_messages)
+    state = client._connection
+
+    def feed():
+        # payloads are built per event: discord.py writes into them, so a kept list would count as retained
+        for i in range(count):
+            state.parse_message_create(chat_payload(i))
+        return client
+
+    _, used = retained(feed)
+    return len(client.cached_messages), used
+
+
+async def measure_groups(count: int):
+    components = GroupRouterView.rendered().to_components()  # views need a running loop
+    client = discord.Client(intents=discord.Intents.default(), max_messages=None)
+    state = client._connection
+    channel = discord.PartialMessageable(state=state, id=CHANNEL_ID, guild_id=GUILD_ID)
+
+    _, full = retained(lambda: [discord.Message(state=state, channel=channel, data=group_payload(i, components)) for i in range(count)])
+    _, ids = retained(lambda: [(CHANNEL_ID, next_id()) for _ in range(count)])
+    return full / count, ids / count
+
+
+def main(args):
+    settings = [("1000 (discord.py default)", 1000), (str(args.small), args.small), ("none", None)]
+
+    print(f"📊 {args.messages} messages through the gateway path")
+    print(f"  {'max_messages':<28} {'cached':>8} {'retained MB':>12}")
+    for label, max_messages in settings:
+        cached, used = measure_cache(max_messages, args.messages)
+        print(f"  {label:<28} {cached:>8} {used / 2**20:>12.2f}")
+
+    full, ids = asyncio.run(measure_groups(args.groups))
+    print(f"\n📊 {args.groups} live groups")
+    print(f"  {'group keeps':<28} {'bytes/group':>12} {'total MB':>10}")
+    print(f"  {'full discord.Message':<28} {full:>12.0f} {full * args.groups / 2**20:>10.2f}")
+    print(f"  {'(channel_id, message_id)':<28} {ids:>12.0f} {ids * args.groups / 2**20:>10.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Message cache and group message reference memory benchmark")
+    parser.add_argument("--messages", type=int, default=20_000, help="MESSAGE_CREATE events fed to each cache")
+    parser.add_argument("--small", type=int, default=100, help="the small max_messages setting to compare")
+    parser.add_argument("--groups", type=int, default=5_000)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
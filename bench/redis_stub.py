@@ -0,0 +1,184 @@
+"""In-process stand-in for a Redis server: just enough RESP2 for bot.backends.RedisBackend.
+
+    python -m bench.redis_stub --port 6390   # then GROUP_STATE_REDIS_URL=redis://localhost:6390/0
+
+Supports PING, AUTH, SELECT, GET, SET (with EX), DEL, WATCH, UNWATCH, MULTI and
+EXEC with Redis' optimistic locking: EXEC returns a nil reply if a watched key
+was written (or expired) since WATCH. Commands run on one event loop, so a
+transaction is applied atomically. Every database number shares one keyspace.
+"""
+import argparse
+import asyncio
+import time
+
+NIL_ARRAY = object()  # EXEC's reply when a watched key changed
+
+
+class RedisStub:
+    def __init__(self):
+        self.data = {}  # key -> value (bytes)
+        self.expires = {}  # key -> time.monotonic() deadline
+        self.revisions = {}  # key -> writes so far, what WATCH compares
+        self.commands = 0
+        self._server = None
+
+    # ---- keyspace ----
+
+    def _touch(self, key):
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+    def _live(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            del self.data[key], self.expires[key]
+            self._touch(key)
+        return key in self.data
+
+    def _changed(self, key, revision):
+        self._live(key)  # an expiry since WATCH counts as a write
+        return self.revisions.get(key, 0) != revision
+
+    def _get(self, key):
+        return self.data[key] if self._live(key) else None
+
+    def _set(self, key, value, *options):
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if len(options) >= 2 and options[0].upper() == b"EX":
+            self.expires[key] = time.monotonic() + int(options[1])
+        self._touch(key)
+        return "OK"
+
+    def _delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._live(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                self._touch(key)
+                removed += 1
+        return removed
+
+    def _run(self, name, args):
+        if name == b"GET":
+            return self._get(args[0])
+        if name == b"SET":
+            return self._set(*args)
+        if name == b"DEL":
+            return self._delete(*args)
+        if name == b"PING":
+            return "PONG"
+        if name in (b"AUTH", b"SELECT"):
+            return "OK"
+        return RuntimeError(f"ERR unknown command '{name.decode()}'")
+
+    # ---- protocol ----
+
+    @staticmethod
+    async def _read_command(reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command, e.g. from telnet
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    @classmethod
+    def _encode(cls, reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if reply is NIL_ARRAY:
+            return b"*-1\r\n"
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, Exception):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(cls._encode(item) for item in reply)
+
+    async def _serve(self, reader, writer):
+        watched = {}  # key -> revision at WATCH
+        queued = None  # commands after MULTI, until EXEC
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if not command:
+                    break
+                self.commands += 1
+                name, args = command[0].upper(), command[1:]
+                if name == b"WATCH":
+                    for key in args:
+                        self._live(key)
+                        watched[key] = self.revisions.get(key, 0)
+                    reply = "OK"
+                elif name == b"UNWATCH":
+                    watched.clear()
+                    reply = "OK"
+                elif name == b"MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = RuntimeError("ERR EXEC without MULTI")
+                    elif any(self._changed(key, revision) for key, revision in watched.items()):
+                        reply = NIL_ARRAY
+                    else:
+                        reply = [self._run(queued_name, queued_args) for queued_name, queued_args in queued]
+                    queued = None
+                    watched.clear()
+                elif queued is not None:
+                    queued.append((name, args))
+                    reply = "QUEUED"
+                else:
+                    reply = self._run(name, args)
+                writer.write(self._encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:  # the run's event loop shutting down under an open connection
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Listen on host:port (0 = any free port); returns the redis:// URL"""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"redis://{host}:{port}/0"
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def main(args):
+    stub = RedisStub()
+    url = await stub.start(args.host, args.port)
+    print(f"🧪 Redis stand-in listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Minimal Redis stand-in for RedisBackend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,189 @@
+"""Replays an interaction trace (INTERACTION_TRACE_FILE) through the cog and UI handlers.
+
+    python -m bench.replay interactions.jsonl --speed 10
+
+--speed 1 keeps the recorded timing, 10 plays it ten times faster and "max" sends
+every event as soon as the previous event of its guild has finished. Events of one
+guild are always handled in trace order, so a Join never overtakes the /fivestack
+that created the group; guilds run concurrently. Uses the same fakes and report as
+bench/load_test.py.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench.load_test import LoadTest, add_common_args, configure_environment, peak_rss_mb, percentile, report, start_bot
+
+SELECT_COMPONENT = 3
+
+
+def load_trace(path: str):
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:  # torn last line of a live trace
+                continue
+    events.sort(key=lambda event: event["t"])
+    return events
+
+
+class Replay(LoadTest):
+    def __init__(self, instance, rest, seed: int = 0):
+        super().__init__(instance, rest, seed=seed)
+        self.guilds = {}  # traced guild -> FakeGuild
+        self.users = {}  # traced user -> FakeUser
+        self.pending = {}  # (guild, user) -> RoleSelect view or TimeModal waiting for the user's next event
+        self.messages = {}  # (traced guild, traced message) -> group it was matched to
+        self.skipped = {}  # reason -> events that could not be replayed
+        self.lag = []  # seconds events were dispatched behind schedule
+
+    def _guild(self, traced_id):
+        from bench.fakes import FakeGuild
+        guild = self.guilds.get(traced_id)
+        if guild is None:
+            guild = self.guilds[traced_id] = FakeGuild(self.rest, name=f"guild{len(self.guilds)}")
+            guild.traced_channels = {}
+        return guild
+
+    def _channel(self, guild, traced_id):
+        from bench.fakes import FakeChannel
+        channel = guild.traced_channels.get(traced_id)
+        if channel is None:
+            if not guild.traced_channels:  # reuse the guild's default channel first
+                channel = guild.text_channels[0]
+            else:
+                channel = FakeChannel(self.rest, guild)
+                guild.text_channels.append(channel)
+            guild.traced_channels[traced_id] = channel
+        return channel
+
+    def _user(self, traced_id):
+        from bench.fakes import FakeUser
+        user = self.users.get(traced_id)
+        if user is None:
+            user = self.users[traced_id] = FakeUser(f"user{len(self.users)}")
+        return user
+
+    def _skip(self, reason: str):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def _group_for(self, guild, channel, traced_message):
+        """The replayed group for a traced message: first seen -> newest unmatched group in the channel"""
+        key = (guild.id, traced_message)
+        view = self.messages.get(key)
+        if view is not None:
+            return view if view in self.instance.groups else None
+        matched = set(map(id, self.messages.values()))
+        for view in reversed(self.instance.groups.in_channel(guild.id, channel.id)):
+            if id(view) not in matched:
+                self.messages[key] = view
+                return view
+        return None
+
+    async def dispatch(self, event):
+        guild = self._guild(event["g"])
+        channel = self._channel(guild, event.get("c"))
+        user = self._user(event["u"])
+        key = (event["g"], event["u"])
+
+        if event["k"] == "command":
+            command = self.cog.session_group.get_command(event["n"])
+            if command is None:
+                return self._skip(f"unknown command {event['n']}")
+            interaction = self._interaction(guild, user, channel=channel)
+            await self._timed(event["n"], command.callback(self.cog, interaction, **(event.get("v") or {})))
+
+        elif event["k"] == "component" and event.get("ct") == SELECT_COMPONENT:
+            role_view = self.pending.pop(key, None)
+            if role_view is None or self.role_select(role_view) is None or not event.get("v"):
+                return self._skip("select without an open role menu")
+            modal = await self.select_role(role_view, guild, user, event["v"][0])
+            if modal is not None:
+                self.pending[key] = modal
+
+        elif event["k"] == "component":
+            view = self._group_for(guild, channel, event.get("m"))
+            if view is None or not any(getattr(item, "custom_id", None) == event["n"] for item in self.router.children):
+                return self._skip("button without an active group")
+            interaction = await self.component(view, event["n"], guild, user)
+            role_view = interaction.response.kwargs.get("view") or interaction.followup.kwargs.get("view")
+            if role_view is not None:
+                self.pending[key] = role_view
+
+        elif event["k"] == "modal":
+            modal = self.pending.pop(key, None)
+            if modal is None or not hasattr(modal, "time_input"):
+                return self._skip("modal without an open role menu")
+            values = event.get("v") or []
+            await self.submit_time(modal, guild, user, values[0] if values else "")
+
+    async def run(self, events, speed: float, concurrency: int):
+        by_guild = {}
+        for event in events:
+            by_guild.setdefault(event["g"], []).append(event)
+        loop = asyncio.get_running_loop()
+        trace_start = events[0]["t"] if events else 0
+        started = loop.time()
+        # at max speed bound the guilds in flight; timed replays are bounded by the trace itself
+        semaphore = asyncio.Semaphore(concurrency if not speed else len(by_guild) or 1)
+
+        async def play(guild_events):
+            async with semaphore:
+                for event in guild_events:
+                    if speed:
+                        delay = started + (event["t"] - trace_start) / speed - loop.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        else:
+                            self.lag.append(-delay)
+                    await self.dispatch(event)
+
+        await asyncio.gather(*(play(guild_events) for guild_events in by_guild.values()))
+
+
+async def main(args):
+    configure_environment(args)
+    events = load_trace(args.trace)
+    if not events:
+        print(f"❌ No events in {args.trace}")
+        return
+    speed = 0 if args.speed == "max" else float(args.speed)
+    rss_before = peak_rss_mb()
+    instance, rest = await start_bot(args)
+
+    replay = Replay(instance, rest, seed=args.seed)
+    started = time.perf_counter()
+    try:
+        await replay.run(events, speed, args.concurrency)
+        elapsed = time.perf_counter() - started
+    finally:
+        await instance.stop_background_tasks()
+
+    recorded = events[-1]["t"] - events[0]["t"]
+    header = (f"replayed {len(events)} events from {len(replay.guilds)} guilds ({recorded:.0f}s of traffic) "
+              f"at {'max' if not speed else f'{speed:g}x'} speed, REST latency {args.latency * 1000:.0f}ms, "
+              f"429 chance {args.rate_limit:.1%}, backend {args.backend}")
+    extra = {"trace": args.trace, "events": len(events), "speed": args.speed, "latency": args.latency,
+             "rate_limit": args.rate_limit, "backend": args.backend}
+    report(header, replay, rest, instance, elapsed, rss_before, args.json, extra)
+    if replay.lag:
+        print(f"  behind schedule  {len(replay.lag)} event(s), p50 {percentile(replay.lag, 0.5) * 1000:.1f}ms, "
+              f"p99 {percentile(replay.lag, 0.99) * 1000:.1f}ms")
+    for reason, count in sorted(replay.skipped.items()):
+        print(f"  skipped          {count} event(s): {reason}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded FiveStack interaction trace")
+    parser.add_argument("trace", help="JSONL trace written with INTERACTION_TRACE_FILE")
+    parser.add_argument("--speed", default="1", help='playback speed: 1, 10, ... or "max"')
+    parser.add_argument("--concurrency", type=int, default=500, help="guilds in flight at once (max speed only)")
+    add_common_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
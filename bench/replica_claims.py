@@ -0,0 +1,109 @@
+"""Two replicas racing for the last seat through RedisBackend.
+
+    python -m bench.replica_claims --rounds 500
+    python -m bench.replica_claims --redis-url redis://localhost:6379/0   # against a real server
+
+Every round seeds a group with four seated players, then two worker processes
+(each with its own RedisBackend connection, like two bot replicas) call
+claim_slot for it at the same moment. Exactly one of them may get seat 5; the
+run fails if both do, if neither does, or if the stored slots disagree with
+the winner. Without --redis-url the server is an in-process bench.redis_stub.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+
+KEY_BASE = 9_000_000_000
+
+
+def _players(count: int):
+    from models.Slot import Role, Slot
+    return [Slot(1_000 + i, f"seated{i}", None, Role.FILL) for i in range(count)]
+
+
+async def _claim_rounds(url: str, replica: int, rounds: int, barrier):
+    from bot.backends.RedisBackend import RedisBackend
+    from models.Slot import Role, Slot
+
+    backend = RedisBackend(url)
+    seats = []
+    try:
+        for round_ in range(rounds):
+            await asyncio.to_thread(barrier.wait)  # both replicas start each round together
+            index, _ = await backend.claim_slot(KEY_BASE + round_, Slot(replica, f"replica{replica}", None, Role.MID))
+            seats.append(index)
+    finally:
+        await backend.close()
+    return seats
+
+
+def _replica(url: str, replica: int, rounds: int, barrier, results):
+    results.put((replica, asyncio.run(_claim_rounds(url, replica, rounds, barrier))))
+
+
+async def main(args):
+    from bot.backends.RedisBackend import RedisBackend
+
+    stub = None
+    url = args.redis_url
+    if url is None:
+        from bench.redis_stub import RedisStub
+        stub = RedisStub()
+        url = await stub.start()
+
+    backend = RedisBackend(url)
+    seated = _players(4) + [None]
+    for round_ in range(args.rounds):
+        await backend.put(KEY_BASE + round_, seated)
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(2)
+    results = context.Queue()
+    workers = [context.Process(target=_replica, args=(url, replica, args.rounds, barrier, results)) for replica in (1, 2)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    # the stub runs on this loop, so wait for the workers off it
+    seats = dict([await asyncio.to_thread(results.get) for _ in workers])
+    for worker in workers:
+        await asyncio.to_thread(worker.join)
+    elapsed = time.perf_counter() - started
+
+    double, missed, mismatched, wins = 0, 0, 0, {1: 0, 2: 0}
+    for round_ in range(args.rounds):
+        winners = [replica for replica in (1, 2) if seats[replica][round_] == 4]
+        stored = (await backend.get(KEY_BASE + round_))[1][4]
+        if len(winners) > 1:
+            double += 1
+        elif not winners:
+            missed += 1
+        elif stored is None or stored.user_id != winners[0]:
+            mismatched += 1
+        else:
+            wins[winners[0]] += 1
+        await backend.delete(KEY_BASE + round_)
+    await backend.close()
+    if stub is not None:
+        await stub.close()
+
+    print(f"📊 {args.rounds} rounds, 2 replicas racing for seat 5 ({elapsed:.2f}s)")
+    print(f"  replica 1 won {wins[1]}, replica 2 won {wins[2]}")
+    print(f"  both seated {double}, nobody seated {missed}, stored slot disagreed {mismatched}")
+    if double or missed or mismatched:
+        print("❌ seat 5 was not claimed exactly once every round")
+        return 1
+    print("✅ seat 5 was claimed exactly once every round")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent seat claims from two RedisBackend replicas")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--redis-url", help="Redis server to race on (default: an in-process bench.redis_stub)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,133 @@
+"""Per-group memory and membership lookup cost: dict slots vs Slot records.
+
+    python -m bench.slot_memory --groups 100000
+    python -m bench.slot_memory --groups 100000 --views 20000   # also full FiveManView objects
+
+The dict layout is what FiveManView used before models.Slot (a list of five
+{"user_id", "username", "time", "role"} dicts, membership by linear scan); the
+compact layout is a tuple of Slot records plus a user_id -> index dict. Player
+names and availability strings are shared between both layouts, so only the
+per-slot containers are measured.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+
+from models.Slot import Role, Slot
+
+TIMES = [None, None, "now", "7PM to 9PM EST", "after 8"]
+
+
+def make_players(count: int, rng):
+    return [(1_000_000_000_000_000 + i, f"player{i}", rng.choice(TIMES), rng.choice(list(Role))) for i in range(count)]
+
+
+def seat(players, rng):
+    filled = rng.randint(0, 5)
+    return rng.sample(players, filled) + [None] * (5 - filled)
+
+
+def dict_group(seated):
+    return [
+        {"user_id": p[0], "username": p[1], "time": p[2], "role": p[3].label} if p else None
+        for p in seated
+    ]
+
+
+_NO_MEMBERS = {}
+
+
+def compact_group(seated):
+    # same layout as FiveManView.apply_slots
+    slots = tuple(Slot(p[0], p[1], p[2], p[3]) if p else None for p in seated)
+    members = {slot.user_id: index for index, slot in enumerate(slots) if slot} or _NO_MEMBERS
+    return slots, members
+
+
+# membership checks as each layout does them
+def dict_lookup(slots, user_id):
+    for i, slot in enumerate(slots):
+        if slot and slot["user_id"] == user_id:
+            return i
+    return None
+
+
+def compact_lookup(group, user_id):
+    return group[1].get(user_id)
+
+
+def measure(build, seatings):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    groups = [build(seated) for seated in seatings]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return groups, (after - before) / len(groups)
+
+
+def time_lookups(lookup, groups, probes):
+    started = time.perf_counter()
+    for group_index, user_id in probes:
+        lookup(groups[group_index], user_id)
+    return (time.perf_counter() - started) / len(probes)
+
+
+async def measure_views(count: int, seatings):
+    from models.FiveManView import FiveManView
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    views = []
+    for i, seated in enumerate(seatings[:count]):
+        view = FiveManView(creator_id=1, guild_id=i)
+        view.apply_slots(compact_group(seated)[0])
+        views.append(view)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    players = make_players(max(args.groups, 1000), rng)
+    seatings = [seat(players, rng) for _ in range(args.groups)]
+    # half the probes hit a seated player, half miss
+    probes = []
+    for _ in range(args.lookups):
+        group_index = rng.randrange(args.groups)
+        seated = [p for p in seatings[group_index] if p]
+        user_id = rng.choice(seated)[0] if seated and rng.random() < 0.5 else rng.choice(players)[0]
+        probes.append((group_index, user_id))
+
+    dict_groups, dict_bytes = measure(dict_group, seatings)
+    compact_groups, compact_bytes = measure(compact_group, seatings)
+    dict_ns = time_lookups(dict_lookup, dict_groups, probes) * 1e9
+    compact_ns = time_lookups(compact_lookup, compact_groups, probes) * 1e9
+
+    print(f"📊 {args.groups} live groups, {args.lookups} membership lookups")
+    print(f"  {'layout':<28} {'bytes/group':>12} {'total MB':>10} {'ns/lookup':>10}")
+    print(f"  {'dict slots (before)':<28} {dict_bytes:>12.0f} {dict_bytes * args.groups / 2**20:>10.1f} {dict_ns:>10.0f}")
+    print(f"  {'Slot records + index':<28} {compact_bytes:>12.0f} {compact_bytes * args.groups / 2**20:>10.1f} {compact_ns:>10.0f}")
+    print(f"  saved {1 - compact_bytes / dict_bytes:.0%} memory per group, lookups {dict_ns / compact_ns:.1f}x faster")
+
+    if args.views:
+        view_bytes = asyncio.run(measure_views(min(args.views, args.groups), seatings))
+        print(f"  full FiveManView (group state and slots): {view_bytes:.0f} bytes/group "
+              f"(~{view_bytes * args.groups / 2**20:.0f} MB at {args.groups} groups)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Slot layout memory and lookup benchmark")
+    parser.add_argument("--groups", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--views", type=int, default=0, help="also measure this many full FiveManView objects")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,133 @@
+import asyncio
+import functools
+
+import discord
+
+from bot.RestScheduler import EDIT, rest_priority
+
+
+class EditCoalescer:
+    """Coalesces edits to group messages.
+
+    Callers mark a view dirty; a single background flusher sends at most one edit per
+    message per `window` seconds, always rendering the newest state at send time.
+    """
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self._dirty = {}  # message_id -> view waiting for an edit
+        self._due = {}  # message_id -> loop time the next edit may go out
+        self._last_edit = {}  # message_id -> loop time of the last edit
+        self._inflight = set()
+        self._flushing = {}  # message_id -> edit being sent
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        # counters
+        self.requested = 0  # mark_dirty calls
+        self.coalesced = 0  # requests folded into an already pending edit
+        self.sent = 0  # edits actually sent
+        self.unchanged = 0  # flushes skipped because the message already showed the state
+        self.failed = 0
+
+    def mark_dirty(self, view):
+        """Schedule an edit of the view's message with its latest state"""
+        message_id = getattr(view, "message_id", None)
+        if not message_id:
+            return
+        self.requested += 1
+        if message_id in self._dirty:
+            self.coalesced += 1
+            self._dirty[message_id] = view
+            return
+
+        now = asyncio.get_running_loop().time()
+        last = self._last_edit.get(message_id)
+        self._dirty[message_id] = view
+        self._due[message_id] = now if last is None else max(now, last + self.window)
+        self._wakeup.set()
+
+    def discard(self, view):
+        """Drop any pending edit (e.g. the group was closed and edited directly)"""
+        message_id = getattr(view, "message_id", None)
+        self._dirty.pop(message_id, None)
+        self._due.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+
+    async def settle(self, view):
+        """Drop any pending edit and wait out one already being sent, so a final edit made after this lands last"""
+        self.discard(view)
+        task = self._flushing.get(getattr(view, "message_id", None))
+        if task is not None:
+            await asyncio.wait([task])  # don't cancel it if we are cancelled
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self, flush: bool = True):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if flush:
+            # send whatever is still pending, ignoring the window
+            views = list(self._dirty.values())
+            self._dirty.clear()
+            self._due.clear()
+            await asyncio.gather(*(self._flush(view) for view in views), return_exceptions=True)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._due:
+                await self._wakeup.wait()
+                continue
+
+            now = loop.time()
+            next_due = min(self._due.values())
+            if next_due > now:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), next_due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for message_id in [mid for mid, due in self._due.items() if due <= now]:
+                del self._due[message_id]
+                view = self._dirty.pop(message_id)
+                self._last_edit[message_id] = now
+                task = asyncio.create_task(self._flush(view))
+                self._inflight.add(task)
+                self._flushing[message_id] = task
+                task.add_done_callback(functools.partial(self._flushed, message_id))
+
+            # forget messages that have been quiet for a whole window
+            if len(self._last_edit) > 1024:
+                cutoff = now - self.window
+                self._last_edit = {mid: t for mid, t in self._last_edit.items() if t > cutoff or mid in self._due}
+
+    def _flushed(self, message_id, task):
+        self._inflight.discard(task)
+        if self._flushing.get(message_id) is task:
+            del self._flushing[message_id]
+
+    async def _flush(self, view):
+        try:
+            with rest_priority(EDIT):
+                edited = await view.refresh_message()
+            if edited:
+                self.sent += 1
+            else:
+                self.unchanged += 1
+        except discord.NotFound:  # message was deleted, nothing left to edit
+            self.discard(view)
+        except discord.HTTPException as e:
+            self.failed += 1
+            print(f"❌ Failed to edit group message {view.message_id}: {e}")
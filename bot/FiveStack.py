@@ -1,81 +1,347 @@
+import asyncio
+import hashlib
+import json
 import os
 import discord
 
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
+from discord.ext import commands
 
-from bot.cogs import *
 import config
-from models import FiveManView
-
-print(config.BOT_ENV)
-print(config.APP_ID)
-print(config.PUBLIC_KEY)
-print(config.DISCORD_TOKEN)
+from bot.GroupStore import GroupStore
+from bot.GroupLifecycle import GroupLifecycle
+from bot.GroupRegistry import GroupRegistry
+from bot.GuildMetadata import GuildMetadataCache
+from bot.Matchmaker import Matchmaker
+from bot.EditCoalescer import EditCoalescer
+from bot.MessageCleaner import MessageCleaner
+from bot.MessageLedger import MessageLedger
+from bot.Notifier import Notifier
+from bot.RestScheduler import CLASS_NAMES, RestScheduler
+from bot.InteractionRecorder import InteractionRecorder
+from bot.StartupProfiler import StartupProfiler
+from bot.Metrics import Metrics
+from bot.MetricsServer import MetricsServer
+from bot.backends import create_backend
 
 class FiveStack:
-    def __init__(self):
+    def __init__(self, cluster_id: int = 0, shard_ids: list = None, shard_count: int = None, profiler: StartupProfiler = None):
         # Don't create group here - let the cog handle it
-        self.active_groups = {}
-        self.bot = commands.Bot(command_prefix="!", intents=config.intents)
+        self.groups = GroupRegistry()  # open groups; only guilds on this process's shards
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.commands_synced = False
+        self.deferred_cogs_loaded = False
+        self.profiler = profiler or StartupProfiler()
+        self.metrics = Metrics()
+        self.metrics_server = None
+        self._stopping = None
+        self.group_store = GroupStore(
+            self.cluster_path(config.SESSION_DATA_FILE),
+            self.cluster_path(config.SESSION_JOURNAL_FILE),
+            flush_interval=config.SESSION_FLUSH_INTERVAL,
+            compact_every=config.SESSION_COMPACT_EVERY,
+        )
+        self.state = create_backend(
+            config.GROUP_STATE_BACKEND,
+            sqlite_path=config.GROUP_STATE_SQLITE_PATH,
+            redis_url=config.GROUP_STATE_REDIS_URL,
+            redis_ttl=self.group_state_ttl(),
+        )
+        self.edit_coalescer = EditCoalescer(window=config.EDIT_COALESCE_WINDOW)
+        self.lifecycle = GroupLifecycle(self, max_age=config.GROUP_MAX_AGE, idle_timeout=config.GROUP_IDLE_TIMEOUT)
+        self.matchmaker = Matchmaker(self, interval=config.MATCHMAKING_INTERVAL)
+        self.message_ledger = MessageLedger(self.cluster_path(config.MESSAGE_LEDGER_FILE), flush_interval=config.SESSION_FLUSH_INTERVAL)
+        self.notifier = Notifier(
+            self,
+            self.cluster_path(config.NOTIFY_QUEUE_FILE),
+            concurrency=config.NOTIFY_CONCURRENCY,
+            max_attempts=config.NOTIFY_MAX_ATTEMPTS,
+            dms=config.NOTIFY_DMS,
+            flush_interval=config.SESSION_FLUSH_INTERVAL,
+        )
+        self.message_cleaner = MessageCleaner(
+            self.cluster_path(config.CLEANUP_STATE_FILE),
+            ledger=self.message_ledger,
+            concurrency=config.CLEANUP_CONCURRENCY,
+            history_limit=config.CLEANUP_HISTORY_LIMIT,
+        )
+        self.recorder = None
+        if config.INTERACTION_TRACE_FILE:
+            self.recorder = InteractionRecorder(
+                self.cluster_path(config.INTERACTION_TRACE_FILE),
+                salt=config.INTERACTION_TRACE_SALT,
+                flush_interval=config.SESSION_FLUSH_INTERVAL,
+            )
+        if shard_count:
+            self.bot = commands.AutoShardedBot(
+                command_prefix="!", intents=config.intents, shard_ids=shard_ids, shard_count=shard_count,
+                max_messages=config.MAX_MESSAGES, http_trace=self.metrics.http_trace(),
+            )
+        else:
+            self.bot = commands.Bot(
+                command_prefix="!", intents=config.intents, max_messages=config.MAX_MESSAGES,
+                http_trace=self.metrics.http_trace(),
+            )
+        self._stop_before_close()
+        self.rest_scheduler = None
+        if config.REST_GLOBAL_RATE:
+            self.rest_scheduler = RestScheduler(global_rate=config.REST_GLOBAL_RATE)
+            self.rest_scheduler.install(self.bot.http)
+        if self.recorder is not None:
+            self.bot.add_listener(self.recorder.on_interaction, "on_interaction")
+        self.guild_metadata = GuildMetadataCache(self.bot, config.PING_ROLE_NAME)
+        for event in ("on_guild_role_create", "on_guild_role_delete", "on_guild_role_update", "on_guild_emojis_update", "on_guild_remove"):
+            self.bot.add_listener(getattr(self.guild_metadata, event), event)
+        self.setup_metrics()
         self.setup_bot_events()
         print("initialized FiveStack class, now need to load cogs")
 
-    async def load_cogs(self):
-        for filename in os.listdir("./bot/cogs"):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                extension = f"bot.cogs.{filename[:-3]}"
-                try:
-                    await self.bot.load_extension(extension)
-                    print(f"✅ Loaded {extension}")
-                    
-                    # Get the Cog instance
-                    cog_name = filename[:-3].capitalize()
-                    cog_instance = self.bot.get_cog(cog_name)
-                    
-                    if cog_instance:
-                        print(f"📋 Cog '{cog_instance.qualified_name}' loaded:")
-                        
-                        # Check for traditional prefix commands
-                        prefix_commands = cog_instance.get_commands()
-                        if prefix_commands:
-                            print(f"  Prefix commands:")
-                            for cmd in prefix_commands:
-                                print(f"   - {cmd.name}")
-                        
-                        # Check for app command groups
-                        if hasattr(cog_instance, 'session_group'):
-                            print(f"  App command group: /{cog_instance.session_group.name}")
-                            for cmd in cog_instance.session_group.commands:
-                                print(f"   - /{cog_instance.session_group.name} {cmd.name}")
-                        
-                        # Check for standalone app commands
-                        app_commands = cog_instance.get_app_commands()
-                        if app_commands:
-                            print(f"  Standalone app commands:")
-                            for cmd in app_commands:
-                                print(f"   - /{cmd.name}")
-                                
-                    else:
-                        print(f"⚠️ Cog instance '{cog_name}' not found in bot.")
-                        
-                except Exception as e:
-                    print(f"❌ Failed to load {extension}: {e}")
-                    import traceback
-                    traceback.print_exc()
+    @staticmethod
+    def group_state_ttl():
+        """Seconds a group's shared state outlives its last write: past every expiry deadline, None if groups never expire"""
+        # every slot change rewrites the key, and a group expires within either lifetime of its last slot change;
+        # an hour of slack covers the sweeper and clock skew between replicas
+        lifetimes = [seconds for seconds in (config.GROUP_MAX_AGE, config.GROUP_IDLE_TIMEOUT) if seconds]
+        return int(min(lifetimes)) + 3600 if lifetimes else None
+
+    def cluster_path(self, path: str):
+        """Per-worker state file in cluster mode (session_data.json -> session_data.cluster1.json)"""
+        if config.CLUSTER_COUNT <= 1:
+            return path
+        return self.cluster_file(path, self.cluster_id)
+
+    @staticmethod
+    def cluster_file(path: str, cluster_id):
+        """session_data.json -> session_data.cluster<cluster_id>.json ("*" gives a glob pattern)"""
+        root, ext = os.path.splitext(path)
+        return f"{root}.cluster{cluster_id}{ext}"
+
+    def owns_guild(self, guild_id: int):
+        """True if the guild's events are delivered to one of this process's shards"""
+        if not self.shard_ids:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    async def load_cogs(self, extensions: list = None):
+        for extension in (config.CORE_COGS if extensions is None else extensions):
+            try:
+                await self.bot.load_extension(extension)
+                print(f"✅ Loaded {extension}")
+                if config.STARTUP_VERBOSE:
+                    self._describe_cog(extension)
+            except Exception as e:
+                print(f"❌ Failed to load {extension}: {e}")
+                import traceback
+                traceback.print_exc()
+
+    def _describe_cog(self, extension: str):
+        # Get the Cog instance
+        cog_name = extension.rsplit(".", 1)[-1].capitalize()
+        cog_instance = self.bot.get_cog(cog_name)
+        
+        if not cog_instance:
+            print(f"⚠️ Cog instance '{cog_name}' not found in bot.")
+            return
+        
+        print(f"📋 Cog '{cog_instance.qualified_name}' loaded:")
+        
+        # Check for traditional prefix commands
+        prefix_commands = cog_instance.get_commands()
+        if prefix_commands:
+            print(f"  Prefix commands:")
+            for cmd in prefix_commands:
+                print(f"   - {cmd.name}")
+        
+        # Check for app command groups
+        if hasattr(cog_instance, 'session_group'):
+            print(f"  App command group: /{cog_instance.session_group.name}")
+            for cmd in cog_instance.session_group.commands:
+                print(f"   - /{cog_instance.session_group.name} {cmd.name}")
+        
+        # Check for standalone app commands
+        app_commands = cog_instance.get_app_commands()
+        if app_commands:
+            print(f"  Standalone app commands:")
+            for cmd in app_commands:
+                print(f"   - /{cmd.name}")
+
+    def restore_groups(self):
+        """Rebuild saved groups into the registry, which is all their buttons need (call before bot.start)"""
+        # imported here: models reach back into bot (for get_bot), and bot/__init__ imports this module
+        from models.FiveManView import FiveManView
+
+        records = []
+        for record in self.group_store.load():
+            if record.get("is_closed") or not record.get("message_id") or not record.get("channel_id"):
+                continue
+            if not self.owns_guild(record.get("guild_id", 0)):
+                continue
+            records.append(record)
+        records.sort(key=lambda record: record.get("created_at", 0))  # registry listings stay oldest first
+        
+        for record in records:
+            try:
+                view = FiveManView.from_record(record)
+            except (KeyError, TypeError) as e:
+                print(f"⚠️ Skipping unreadable saved group {record.get('message_id')}: {e}")
+                continue
+            self.lifecycle.register(view)
+        return len(self.groups)
+
+    async def sync_group_state(self):
+        """Seed the state backend with restored groups, or adopt its newer slots if it already has them"""
+        for view in self.groups:
+            view.apply_slots(await self.state.seed(view.message_id, view.slots))
+
+    def setup_metrics(self):
+        add_gauge = self.metrics.add_gauge
+        add_gauge("fivestack_active_groups", "Groups held by this process", lambda: len(self.groups))
+        add_gauge("fivestack_registered_views", "Persistent views registered with discord.py", lambda: len(self.bot.persistent_views))
+        add_gauge("fivestack_groups_expired_total", "Groups closed by the expiry sweeper", lambda: self.lifecycle.expired, "counter")
+        add_gauge("fivestack_queued_players", "Players waiting in matchmaking queues", lambda: self.matchmaker.queued())
+        add_gauge("fivestack_groups_matched_total", "Groups formed from matchmaking queues", lambda: self.matchmaker.stacks_formed, "counter")
+        add_gauge("fivestack_players_matched_total", "Players seated in groups formed from matchmaking queues", lambda: self.matchmaker.players_matched, "counter")
+        add_gauge("fivestack_notifications_pending", "Notifications queued or waiting for a retry", lambda: len(self.notifier))
+        add_gauge("fivestack_notifications_sent_total", "Notifications delivered", lambda: self.notifier.sent, "counter")
+        add_gauge("fivestack_notifications_retried_total", "Notification attempts retried after 429/5xx/connection errors", lambda: self.notifier.retried, "counter")
+        add_gauge("fivestack_notifications_failed_total", "Notifications given up on", lambda: self.notifier.failed, "counter")
+        add_gauge("fivestack_edits_requested_total", "Group message edits requested", lambda: self.edit_coalescer.requested, "counter")
+        add_gauge("fivestack_edits_coalesced_total", "Edits folded into an already pending edit", lambda: self.edit_coalescer.coalesced, "counter")
+        add_gauge("fivestack_edits_sent_total", "Group message edits sent", lambda: self.edit_coalescer.sent, "counter")
+        add_gauge("fivestack_edits_unchanged_total", "Edits skipped because nothing visible changed", lambda: self.edit_coalescer.unchanged, "counter")
+        if self.rest_scheduler is not None:
+            scheduler = self.rest_scheduler
+            by_class = lambda values: {(name,): value for name, value in zip(CLASS_NAMES, values)}
+            add_gauge("fivestack_rest_queue_depth", "REST calls waiting for a rate limit token", lambda: by_class(scheduler.queued), labels=("class",))
+            add_gauge("fivestack_rest_scheduled_total", "REST calls passed through the scheduler", lambda: by_class(scheduler.scheduled), "counter", ("class",))
+            add_gauge("fivestack_rest_delayed_total", "REST calls that had to wait for a token", lambda: by_class(scheduler.delayed), "counter", ("class",))
+            scheduler.wait_histogram = self.metrics.add_histogram(
+                "fivestack_rest_wait_seconds", "Time REST calls spent queued in the scheduler", ("class",)
+            )
+
+    async def start_background_tasks(self):
+        if config.METRICS_PORT:
+            self.metrics_server = MetricsServer(self.metrics, config.METRICS_HOST, config.METRICS_PORT + self.cluster_id)
+            await self.metrics_server.start()
+        await self.group_store.start()
+        await self.edit_coalescer.start()
+        await self.message_ledger.start()
+        await self.matchmaker.start()
+        if self.recorder is not None:
+            await self.recorder.start()
+
+    def _stop_before_close(self):
+        """Make bot.close() stop the background tasks first, while the HTTP session can still send"""
+        close = self.bot.close
+
+        async def close_after_background_tasks():
+            await self.stop_background_tasks()
+            await close()
+
+        self.bot.close = close_after_background_tasks
+
+    async def stop_background_tasks(self):
+        # runs once, whether bot.close() or the caller gets here first
+        if self._stopping is None:
+            self._stopping = asyncio.ensure_future(self._stop_background_tasks())
+        await self._stopping
+
+    async def _stop_background_tasks(self):
+        await self.lifecycle.close()
+        await self.matchmaker.close()
+        await self.notifier.close()
+        # flush pending edits (the HTTP session is still open, see _stop_before_close) so the journal reflects what users last saw
+        await self.edit_coalescer.close()
+        await self.group_store.close()
+        await self.message_ledger.close()
+        if self.recorder is not None:
+            await self.recorder.close()
+        await self.state.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+
+    def command_tree_hash(self, guild=None):
+        """Hash of the command payload Discord would receive for this scope"""
+        payload = [command.to_dict(self.bot.tree) for command in self.bot.tree.get_commands(guild=guild)]
+        payload.sort(key=lambda command: command["name"])
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _load_command_hashes(self):
+        try:
+            with open(config.COMMAND_HASH_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_command_hashes(self, hashes):
+        with open(config.COMMAND_HASH_FILE, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, indent=2)
+
+    async def sync_commands(self):
+        """Sync the command tree only where it changed since the last sync; returns the scopes synced"""
+        if config.DEV_GUILD_IDS:
+            # dev: guild commands update instantly and don't touch the global (rate-limited) list
+            guilds = [discord.Object(id=guild_id) for guild_id in config.DEV_GUILD_IDS]
+            for guild in guilds:
+                self.bot.tree.copy_global_to(guild=guild)
+        else:
+            guilds = [None]
+
+        hashes = self._load_command_hashes()
+        synced_scopes = []
+        for guild in guilds:
+            scope = f"{self.bot.application_id}:{guild.id if guild else 'global'}"
+            tree_hash = self.command_tree_hash(guild=guild)
+            if hashes.get(scope) == tree_hash and not config.FORCE_COMMAND_SYNC:
+                continue
+            synced = await self.bot.tree.sync(guild=guild)
+            print(f"🔃 Synced {len(synced)} command(s) to {scope}")
+            for cmd in synced:
+                print(f"  - {cmd.name} ({cmd.type})")
+            hashes[scope] = tree_hash
+            synced_scopes.append(scope)
+
+        if synced_scopes:
+            await asyncio.to_thread(self._save_command_hashes, hashes)
+        else:
+            print("🔃 Command tree unchanged, skipping sync")
+        return synced_scopes
 
     def setup_bot_events(self):
         @self.bot.event
         async def on_ready():
+            self.profiler.end("first_ready")
+            # expired groups are edited and notifications sent over REST, so both wait for a logged in client
+            await self.lifecycle.start()
+            await self.notifier.start()
+            # non-critical cogs load once the bot is already serving interactions, but before the command sync
+            # below, so their commands are part of the tree it hashes and uploads
+            if config.DEFERRED_COGS and not self.deferred_cogs_loaded:
+                self.deferred_cogs_loaded = True
+                with self.profiler.phase("deferred_cog_load"):
+                    await self.load_cogs(config.DEFERRED_COGS)
+            if self.cluster_id != 0:  # commands are global; one worker syncing is enough
+                print(f"✅ Logged in as {self.bot.user} (cluster {self.cluster_id}, shards {self.shard_ids})")
+                self.finish_startup()
+                return
+            # on_ready fires again after every gateway reconnect; commands only need syncing once per process
+            if self.commands_synced:
+                print(f"✅ Reconnected as {self.bot.user}")
+                return
             try:
-                synced = await self.bot.tree.sync()
-                print(f"🔃 Synced {len(synced)} command(s)")
-                for cmd in synced:
-                    print(f"  - {cmd.name} ({cmd.type})")
+                with self.profiler.phase("command_sync"):
+                    await self.sync_commands()
+                self.commands_synced = True
                 # self.bot.add_view(FiveManView(0, 0))
                 print(f"✅ Logged in as {self.bot.user}")
             except Exception as e:
                 print(f"❌ Error syncing commands: {e}")
                 import traceback
-                traceback.print_exc()
\ No newline at end of file
+                traceback.print_exc()
+            self.finish_startup()
+
+    def finish_startup(self):
+        if self.profiler.finished:
+            return
+        self.profiler.finish(config.STARTUP_REPORT_FILE if config.STARTUP_PROFILE else None)
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+import discord
+
+from bot.RestScheduler import EDIT, rest_priority
+
+
+class GroupLifecycle:
+    """Owns the lifetime of groups: registration, unregistration and expiry.
+
+    Registered groups go into the GroupRegistry and onto a min-heap keyed by their
+    expiry deadline (`created_at + max_age` or `last_refresh + idle_timeout`,
+    whichever comes first). A single sweeper task sleeps until the earliest
+    deadline and then takes every group due within `resolution` seconds, so groups
+    expiring around the same time are handled as one batch. Entries whose group saw
+    activity since they were pushed are pushed again with their new deadline.
+    Unregistered groups leave their entry behind until it comes up, unless enough
+    of them pile up that the heap is rebuilt without them.
+    Expired groups get their buttons disabled in one edit per message and are
+    removed from the registry, which is all the shared GroupRouterView routes by.
+    """
+
+    def __init__(self, instance, max_age: float = 0, idle_timeout: float = 0, resolution: float = 5.0, concurrency: int = 4):
+        self.instance = instance
+        self.max_age = max_age  # seconds since creation, 0 = never
+        self.idle_timeout = idle_timeout  # seconds since the last slot change, 0 = never
+        self.resolution = resolution
+        self.concurrency = concurrency
+        self.expired = 0
+        self._heap = []  # (deadline, seq, view)
+        self._dead = 0  # entries of unregistered groups still in the heap (roughly: not every group has one)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def deadline(self, view):
+        deadlines = []
+        if self.max_age:
+            deadlines.append(view.created_at + self.max_age)
+        if self.idle_timeout:
+            deadlines.append(view.last_refresh + self.idle_timeout)
+        return min(deadlines) if deadlines else None
+
+    def register(self, view):
+        """Add a group to the registry (button presses find it there by message ID) and schedule its expiry"""
+        self.instance.groups.add(view)
+        deadline = self.deadline(view)
+        if deadline is None:
+            return
+        if not self._heap or deadline < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (deadline, next(self._seq), view))
+
+    def unregister(self, view):
+        """Forget a group: drop it everywhere it is referenced"""
+        self.instance.groups.remove(view)
+        self.instance.group_store.discard(view)
+        self.instance.edit_coalescer.discard(view)
+        # long deadlines would keep closed groups alive for hours; drop them once they are half the heap
+        self._dead += 1
+        if self._dead > 64 and self._dead * 2 > len(self._heap):
+            self._compact()
+
+    def _live(self, view):
+        return not view.is_closed and view in self.instance.groups
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._live(entry[2])]
+        heapq.heapify(self._heap)
+        self._dead = 0
+
+    # ---- sweeper ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _pop_expired(self, now: float):
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, view = heapq.heappop(self._heap)
+            if not self._live(view):
+                self._dead = max(0, self._dead - 1)
+                continue  # closed since it was scheduled
+            deadline = self.deadline(view)
+            if deadline is not None and deadline > now:  # active since it was pushed
+                heapq.heappush(self._heap, (deadline, next(self._seq), view))
+                continue
+            expired.append(view)
+        return expired
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            expired = self._pop_expired(time.time() + self.resolution)
+            if expired:
+                try:
+                    await self.expire(expired)
+                except Exception as e:
+                    print(f"❌ Error expiring groups: {e}")
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def expire(self, views):
+        """Close groups and disable their buttons, one edit per message"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def expire_one(view):
+            view.is_closed = True
+            self.unregister(view)
+            embed = discord.Embed(
+                title="⌛ FiveStack Group - Expired",
+                description="This group expired. Start a new one with the fivestack command.",
+                color=discord.Color.dark_grey(),
+            )
+            async with semaphore:
+                await self.instance.edit_coalescer.settle(view)  # a refresh still being sent would land after this edit
+                try:
+                    message = view.partial_message()
+                    if message is not None:
+                        await message.edit(embed=embed, view=view.components(disabled=True))
+                except discord.NotFound:  # message was deleted, OK
+                    pass
+                except discord.HTTPException as e:
+                    print(f"❌ Failed to disable expired group {view.message_id}: {e}")
+                if view.message_id:
+                    await self.instance.state.delete(view.message_id)
+            self.expired += 1
+
+        with rest_priority(EDIT):
+            await asyncio.gather(*(expire_one(view) for view in views))
+        print(f"⌛ Expired {len(views)} stale group(s)")
@@ -0,0 +1,100 @@
+class GroupRegistry:
+    """Every open group held by this process, indexed for O(1) lookups.
+
+    Indexes:
+        message_id            -> group (which group a button press belongs to)
+        guild_id              -> groups in the guild
+        (guild_id, channel_id) -> groups in the channel
+        (guild_id, user_id)   -> groups the user is seated in
+    Groups sets are insertion-ordered dicts, so listings come out oldest first.
+    The member index is kept current by FiveManView.apply_slots, which calls
+    members_changed() on the registry it was added to.
+    """
+
+    def __init__(self):
+        self._groups = {}  # view -> None
+        self._by_message = {}
+        self._by_guild = {}
+        self._by_channel = {}
+        self._by_member = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __iter__(self):
+        return iter(list(self._groups))
+
+    def __contains__(self, view):
+        return view in self._groups
+
+    @staticmethod
+    def _index(index: dict, key, view):
+        index.setdefault(key, {})[view] = None
+
+    @staticmethod
+    def _unindex(index: dict, key, view):
+        views = index.get(key)
+        if views is not None:
+            views.pop(view, None)
+            if not views:
+                del index[key]
+
+    def add(self, view):
+        if view in self._groups:
+            return
+        self._groups[view] = None
+        self._index(self._by_guild, view.guild_id, view)
+        self._index(self._by_channel, (view.guild_id, view.channel_id), view)
+        for user_id in view.member_ids():
+            self._index(self._by_member, (view.guild_id, user_id), view)
+        if view.message_id:
+            self._by_message[view.message_id] = view
+        view.registry = self
+
+    def bind_message(self, view):
+        """Index a group by its message once the message has been posted"""
+        if view in self._groups and view.message_id:
+            self._by_message[view.message_id] = view
+
+    def remove(self, view):
+        if view not in self._groups:
+            return
+        del self._groups[view]
+        self._unindex(self._by_guild, view.guild_id, view)
+        self._unindex(self._by_channel, (view.guild_id, view.channel_id), view)
+        for user_id in view.member_ids():
+            self._unindex(self._by_member, (view.guild_id, user_id), view)
+        if view.message_id and self._by_message.get(view.message_id) is view:
+            del self._by_message[view.message_id]
+        view.registry = None
+
+    def members_changed(self, view, old_user_ids, new_user_ids):
+        for user_id in old_user_ids - new_user_ids:
+            self._unindex(self._by_member, (view.guild_id, user_id), view)
+        for user_id in new_user_ids - old_user_ids:
+            self._index(self._by_member, (view.guild_id, user_id), view)
+
+    # ---- lookups ----
+
+    def get(self, message_id: int):
+        return self._by_message.get(message_id)
+
+    def for_message(self, message):
+        """The open group a component interaction's message belongs to, or None"""
+        return self._by_message.get(message.id) if message is not None else None
+
+    def in_guild(self, guild_id: int):
+        return list(self._by_guild.get(guild_id, ()))
+
+    def in_channel(self, guild_id: int, channel_id: int):
+        return list(self._by_channel.get((guild_id, channel_id), ()))
+
+    def count_in_guild(self, guild_id: int):
+        return len(self._by_guild.get(guild_id, ()))
+
+    def count_in_channel(self, guild_id: int, channel_id: int):
+        return len(self._by_channel.get((guild_id, channel_id), ()))
+
+    def groups_of(self, guild_id: int, user_id: int):
+        """Groups in the guild the user is seated in"""
+        return list(self._by_member.get((guild_id, user_id), ()))
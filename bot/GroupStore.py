@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import time
+
+
+class GroupStore:
+    """Write-behind persistence for active groups.
+
+    Changes are buffered in memory (latest state per message wins), appended to a
+    JSONL journal by a background task off the event loop, and periodically
+    compacted into a single snapshot file.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: str, flush_interval: float = 2.0, compact_every: int = 500):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+
+        self.records = {}  # message_id -> latest group record
+        self._pending = {}  # message_id -> journal entry waiting to be flushed
+        self._journal_entries = 0
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+
+    # ---- loading ----
+
+    def load(self):
+        """Read the snapshot and replay the journal; returns the list of saved group records"""
+        self.records = {}
+        for record in self._read_snapshot():
+            if record.get("message_id"):
+                self.records[record["message_id"]] = record
+
+        self._journal_entries = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # torn write from a crash, ignore the tail
+                        continue
+                    self._apply(entry)
+                    self._journal_entries += 1
+        except FileNotFoundError:
+            pass
+
+        return list(self.records.values())
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+        if isinstance(data, dict) and "groups" in data:
+            return data["groups"]
+        if isinstance(data, dict) and "message_id" in data:  # legacy single-group file
+            return [data]
+        return []
+
+    def _apply(self, entry):
+        if entry.get("op") == "put":
+            group = entry["group"]
+            self.records[group["message_id"]] = group
+        elif entry.get("op") == "del":
+            self.records.pop(entry["message_id"], None)
+
+    # ---- recording ----
+
+    def record(self, view):
+        """Queue the current state of a group for persistence"""
+        if not getattr(view, "message_id", None):
+            return  # not posted yet, nothing to restore
+        group = view.to_record()
+        self.records[view.message_id] = group
+        self._pending[view.message_id] = {"op": "put", "group": group}
+
+    def discard(self, view):
+        """Queue removal of a closed/reset group"""
+        message_id = getattr(view, "message_id", None)
+        if not message_id:
+            return
+        self.records.pop(message_id, None)
+        self._pending[message_id] = {"op": "del", "message_id": message_id}
+
+    # ---- background flushing ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to persist groups: {e}")
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._pending:
+                entries = list(self._pending.values())
+                self._pending = {}
+                await asyncio.to_thread(self._append, entries)
+                self._journal_entries += len(entries)
+
+            if self._journal_entries >= self.compact_every:
+                await asyncio.to_thread(self._compact, list(self.records.values()))
+                self._journal_entries = 0
+
+    def _append(self, entries):
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---- moving groups between workers ----
+
+    @classmethod
+    def repartition(cls, sources, targets, owner_of):
+        """Rewrite saved groups into the files of the workers that now own them (run while no worker is running).
+
+        sources: (snapshot, journal) path pairs to read; targets: owner -> (snapshot, journal)
+        to write; owner_of(record) -> owner. Targets are written before any other source
+        is emptied, so a crash in between only leaves duplicates for the next run to merge.
+        Returns the number of groups that changed files.
+        """
+        records, found_in = {}, {}
+        for snapshot_path, journal_path in sources:
+            for record in cls(snapshot_path, journal_path).load():
+                records[record["message_id"]] = record
+                found_in[record["message_id"]] = (snapshot_path, journal_path)
+
+        by_owner = {owner: [] for owner in targets}
+        moved = 0
+        for message_id, record in records.items():
+            owner = owner_of(record)
+            by_owner[owner].append(record)
+            if found_in[message_id] != targets[owner]:
+                moved += 1
+
+        for owner, (snapshot_path, journal_path) in targets.items():
+            cls(snapshot_path, journal_path)._compact(by_owner[owner])
+        for snapshot_path, journal_path in sources:
+            if (snapshot_path, journal_path) not in targets.values():
+                for path in (snapshot_path, journal_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return moved
+
+    def _compact(self, groups):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.time(), "groups": groups}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # everything in the journal is now covered by the snapshot
+        open(self.journal_path, "w").close()
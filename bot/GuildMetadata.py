@@ -0,0 +1,91 @@
+import discord
+
+from models.Slot import ROLE_EMOJIS
+
+
+class GuildMetadata:
+    """What the hot path needs from a guild, resolved once"""
+
+    __slots__ = ("ping_mention", "lane_emojis")
+
+    def __init__(self, ping_mention: str, lane_emojis: dict):
+        self.ping_mention = ping_mention  # "<@&id>" of the ping role, or ""
+        self.lane_emojis = lane_emojis  # role label -> emoji string
+
+
+# without a guild (or a guild without its own lane emojis) use the emojis RoleSelect shows
+DEFAULT_LANE_EMOJIS = {role.label: emoji for role, emoji in ROLE_EMOJIS.items()}
+_LANE_EMOJI_NAMES = {role.label: discord.PartialEmoji.from_str(emoji).name for role, emoji in ROLE_EMOJIS.items()}
+
+
+class GuildMetadataCache:
+    """Per-guild ping role and lane emojis, built on first use and dropped on change.
+
+    Building scans guild.roles and guild.emojis once; after that commands and embed
+    renders are dictionary lookups. Role events only invalidate a guild when the
+    ping role is involved (role reorders fire updates for many roles); emoji updates
+    always do.
+    """
+
+    def __init__(self, bot, ping_role_name: str):
+        self.bot = bot
+        self.ping_role_name = ping_role_name
+        self._guilds = {}  # guild_id -> GuildMetadata
+        self.builds = 0
+
+    def get(self, guild):
+        metadata = self._guilds.get(guild.id)
+        if metadata is None:
+            metadata = self._guilds[guild.id] = self._build(guild)
+        return metadata
+
+    def get_by_id(self, guild_id: int):
+        """Metadata for a guild ID, or None if the guild isn't cached by discord.py"""
+        metadata = self._guilds.get(guild_id)
+        if metadata is None:
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                return None
+            metadata = self._guilds[guild_id] = self._build(guild)
+        return metadata
+
+    def ping_mention(self, guild):
+        return self.get(guild).ping_mention
+
+    def lane_emojis(self, guild_id: int):
+        metadata = self.get_by_id(guild_id)
+        return metadata.lane_emojis if metadata is not None else DEFAULT_LANE_EMOJIS
+
+    def invalidate(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def _build(self, guild):
+        self.builds += 1
+        role = discord.utils.get(guild.roles, name=self.ping_role_name)
+        wanted = {name: label for label, name in _LANE_EMOJI_NAMES.items()}
+        lane_emojis = dict(DEFAULT_LANE_EMOJIS)
+        for emoji in guild.emojis:
+            label = wanted.get(emoji.name)
+            if label is not None:
+                lane_emojis[label] = str(emoji)
+        return GuildMetadata(role.mention if role else "", lane_emojis)
+
+    # ---- gateway events (registered by FiveStack) ----
+
+    async def on_guild_role_create(self, role):
+        if role.name == self.ping_role_name:
+            self.invalidate(role.guild.id)
+
+    async def on_guild_role_delete(self, role):
+        if role.name == self.ping_role_name:
+            self.invalidate(role.guild.id)
+
+    async def on_guild_role_update(self, before, after):
+        if self.ping_role_name in (before.name, after.name):
+            self.invalidate(after.guild.id)
+
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.invalidate(guild.id)
+
+    async def on_guild_remove(self, guild):
+        self.invalidate(guild.id)
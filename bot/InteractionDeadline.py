@@ -0,0 +1,114 @@
+import asyncio
+
+import discord
+
+
+class DeadlineResponse:
+    """Stands in for interaction.response while a handler runs and defers it before the 3s deadline.
+
+    If the handler hasn't answered `budget` seconds after the interaction was created
+    (measured from its snowflake, so time spent queued on a busy loop counts), the
+    interaction is deferred: commands get a "thinking" state, components and modals a
+    deferred update. Replies the handler sends afterwards are routed to where the
+    deferral left them: send_message becomes a followup, edit_message edits the
+    original response and defer is a no-op. Handlers that answer with a modal can't
+    be deferred and are wrapped with defer=False.
+    """
+
+    def __init__(self, interaction, budget: float, ephemeral: bool = True):
+        self.interaction = interaction
+        self.budget = budget
+        self.ephemeral = ephemeral  # for commands: ephemeral "thinking" state, fixed when deferring
+        self._response = interaction.response
+        self._lock = asyncio.Lock()  # orders the timer's defer against the handler's first reply
+        self._timer = None
+        self.auto_deferred = False
+        self.replied = False
+        self.missed = False  # the deferral itself came too late (Discord had already expired the interaction)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def install(self):
+        """Replace interaction.response and start the deadline timer"""
+        # discord.py caches Interaction.response in this slot
+        self.interaction._cs_response = self
+        age = (discord.utils.utcnow() - self.interaction.created_at).total_seconds()
+        self._timer = asyncio.create_task(self._expire(max(0.0, self.budget - age)))
+        return self
+
+    def cancel(self):
+        # a deferral already on the wire is left to finish
+        if self._timer is not None and not self.auto_deferred:
+            self._timer.cancel()
+        self._timer = None
+
+    async def _expire(self, delay: float):
+        await asyncio.sleep(delay)
+        async with self._lock:
+            if self._response.is_done():
+                return
+            self.auto_deferred = True
+            try:
+                await self._response.defer(ephemeral=self.ephemeral, thinking=False)
+            except discord.NotFound:  # unknown interaction: the 3s window had already passed
+                self.missed = True
+            except discord.HTTPException as e:
+                print(f"❌ Failed to defer interaction {self.interaction.id}: {e}")
+
+    def is_done(self):
+        """True once the handler itself has answered (an automatic deferral doesn't count)"""
+        return self.replied or (self._response.is_done() and not self.auto_deferred)
+
+    async def send_message(self, content=None, **kwargs):
+        async with self._lock:
+            if self.auto_deferred:
+                kwargs.pop("delete_after", None)
+                result = await self.interaction.followup.send(content, **kwargs)
+            else:
+                result = await self._response.send_message(content, **kwargs)
+            self.replied = True
+            return result
+
+    async def edit_message(self, **kwargs):
+        async with self._lock:
+            if self.auto_deferred:
+                result = await self.interaction.edit_original_response(**kwargs)
+            else:
+                result = await self._response.edit_message(**kwargs)
+            self.replied = True
+            return result
+
+    async def send_or_edit(self, content=None, **kwargs):
+        """send_message, or edit the original response if there already is one (answered or deferred)"""
+        async with self._lock:
+            if self.auto_deferred or self._response.is_done():
+                kwargs.pop("ephemeral", None)  # fixed by the first response
+                result = await self.interaction.edit_original_response(content=content, **kwargs)
+            else:
+                result = await self._response.send_message(content, **kwargs)
+            self.replied = True
+            return result
+
+    async def defer(self, **kwargs):
+        async with self._lock:
+            result = None if self.auto_deferred else await self._response.defer(**kwargs)
+            self.replied = True
+            return result
+
+    async def send_modal(self, modal):
+        async with self._lock:
+            result = await self._response.send_modal(modal)
+            self.replied = True
+            return result
+
+
+async def send_or_edit(interaction, content=None, **kwargs):
+    """Reply to the interaction, or edit its original response if it was already answered or deferred"""
+    if isinstance(interaction.response, DeadlineResponse):
+        # decided under the deadline's lock, so an automatic deferral can't slip in between
+        return await interaction.response.send_or_edit(content, **kwargs)
+    if interaction.response.is_done():
+        kwargs.pop("ephemeral", None)
+        return await interaction.edit_original_response(content=content, **kwargs)
+    return await interaction.response.send_message(content, **kwargs)
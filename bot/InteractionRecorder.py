@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import discord
+
+
+class InteractionRecorder:
+    """Opt-in trace of incoming interactions, for replaying real traffic in bench/replay.py.
+
+    Each line of the trace file is a compact JSON object:
+        {"t": unix time, "k": "command" | "component" | "modal", "n": command name or custom_id,
+         "g": guild, "c": channel, "u": user, "m": message, "ct": component type, "v": options/values}
+    Guild, channel, user and message IDs are replaced by salted hashes, so a trace
+    keeps who-did-what-where without holding real IDs. Writes are buffered and
+    appended off the event loop.
+    """
+
+    def __init__(self, path: str, salt: str = None, flush_interval: float = 2.0):
+        self.path = path
+        self.salt = (salt or os.urandom(16).hex()).encode()
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._pending = []
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+
+    def anonymize(self, snowflake):
+        """Stable 48-bit stand-in for an ID (same salt -> same value)"""
+        if snowflake is None:
+            return None
+        digest = hashlib.blake2b(str(snowflake).encode(), key=self.salt, digest_size=6).digest()
+        return int.from_bytes(digest, "big")
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        try:
+            event = self._describe(interaction)
+        except Exception as e:  # never let tracing break interaction handling
+            print(f"⚠️ Could not record interaction: {e}")
+            return
+        if event is not None:
+            self.record(event)
+
+    def record(self, event: dict):
+        self._pending.append(event)
+        self.recorded += 1
+
+    def _describe(self, interaction: discord.Interaction):
+        data = interaction.data or {}
+        event = {
+            "t": round(interaction.created_at.timestamp(), 3),
+            "g": self.anonymize(interaction.guild_id),
+            "c": self.anonymize(interaction.channel_id),
+            "u": self.anonymize(interaction.user.id),
+        }
+
+        if interaction.type == discord.InteractionType.application_command:
+            # /5stack fivestack -> "fivestack" with its options
+            name, options = data.get("name"), data.get("options") or []
+            while options and options[0].get("type") in (1, 2):  # subcommand (group)
+                name, options = options[0]["name"], options[0].get("options") or []
+            event.update(k="command", n=name, v={option["name"]: option.get("value") for option in options})
+        elif interaction.type == discord.InteractionType.component:
+            event.update(k="component", n=data.get("custom_id"), ct=data.get("component_type"), v=data.get("values") or [])
+            if interaction.message is not None:
+                event["m"] = self.anonymize(interaction.message.id)
+        elif interaction.type == discord.InteractionType.modal_submit:
+            values = [
+                component.get("value")
+                for row in data.get("components") or []
+                for component in row.get("components") or []
+            ]
+            event.update(k="modal", n=data.get("custom_id"), v=values)
+        else:
+            return None
+        return event
+
+    # ---- background flushing ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to write interaction trace: {e}")
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._pending:
+                events, self._pending = self._pending, []
+                await asyncio.to_thread(self._append, events)
+
+    def _append(self, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
@@ -0,0 +1,207 @@
+import asyncio
+
+import discord
+
+from bot.RestScheduler import NOTIFY, rest_priority
+from models.Slot import Role, Slot
+
+
+LANES = (Role.TOP, Role.JUNGLE, Role.MID, Role.ADC, Role.SUPPORT)  # seat order of a matched group
+
+
+def max_stacks(lane_counts, fill_count: int):
+    """Most complete stacks the pool can form.
+
+    k stacks need k players per lane; a lane short by k - count borrows Fill players,
+    so k is feasible while the summed shortfall fits in the Fill pool (and 5k players exist).
+    Feasibility is monotonic in k, so binary search it.
+    """
+    low, high = 0, (sum(lane_counts) + fill_count) // 5
+    while low < high:
+        k = (low + high + 1) // 2
+        if sum(k - count for count in lane_counts if count < k) <= fill_count:
+            low = k
+        else:
+            high = k - 1
+    return low
+
+
+def form_stacks(queue):
+    """Split a FIFO queue of Slot records into as many role-complete stacks as possible.
+
+    Each player names one lane or Fill, so the player -> seat bipartite matching
+    collapses to counting: max_stacks gives the optimum, then one pass in queue order
+    takes players while their lane (or, for Fill, any lane) still has an open seat,
+    so the longest-waiting players go first. Returns (stacks, leftover): stacks are
+    tuples of five Slots in LANES order with the assigned lane as the role.
+    """
+    lanes = {lane: [] for lane in LANES}
+    fill = []
+    for slot in queue:
+        lanes.get(slot.role, fill).append(slot)
+    k = max_stacks([len(players) for players in lanes.values()], len(fill))
+    if not k:
+        return [], list(queue)
+
+    taken = {lane: 0 for lane in LANES}
+    chosen = set()  # ids of matched players
+    seats = 5 * k
+    for slot in queue:
+        if not seats:
+            break
+        lane = slot.role if slot.role in taken else None
+        if lane is not None:
+            if taken[lane] == k:
+                continue
+            taken[lane] += 1
+        chosen.add(slot.user_id)
+        seats -= 1
+
+    # lane players keep their lane in queue order; matched Fill players take the gaps
+    gaps = iter([slot for slot in fill if slot.user_id in chosen])
+    stacks = [[None] * 5 for _ in range(k)]
+    for seat, lane in enumerate(LANES):
+        players = [slot for slot in lanes[lane] if slot.user_id in chosen]
+        for i, stack in enumerate(stacks):
+            player = players[i] if i < len(players) else next(gaps)
+            stack[seat] = player if player.role == lane else Slot(player.user_id, player.username, player.time, lane)
+    leftover = [slot for slot in queue if slot.user_id not in chosen]
+    return [tuple(stack) for stack in stacks], leftover
+
+
+class Matchmaker:
+    """Per-guild role queues, matched into complete groups in batches.
+
+    Players queue with the role picked in RoleSelect. Every `interval` seconds the
+    guilds whose queue changed are matched with form_stacks, and each stack is posted
+    as a full FiveStack group in the channel its players queued from.
+    """
+
+    def __init__(self, instance, interval: float = 5.0):
+        self.instance = instance
+        self.interval = interval
+        self._queues = {}  # guild_id -> {user_id: Slot}, insertion ordered (FIFO)
+        self._channels = {}  # guild_id -> channel the queue panel was last used in
+        self._dirty = set()  # guilds queued into since the last tick
+        self._task = None
+
+        # counters
+        self.stacks_formed = 0
+        self.players_matched = 0
+
+    def queued(self, guild_id: int = None):
+        if guild_id is None:
+            return sum(len(queue) for queue in self._queues.values())
+        return len(self._queues.get(guild_id, ()))
+
+    def position(self, guild_id: int, user_id: int):
+        """1-based queue position, or None if not queued"""
+        for position, queued_id in enumerate(self._queues.get(guild_id, ()), 1):
+            if queued_id == user_id:
+                return position
+        return None
+
+    def enqueue(self, guild_id: int, channel, slot: Slot):
+        """Queue a player (re-queueing moves them to the back with the new role); returns their position"""
+        queue = self._queues.setdefault(guild_id, {})
+        queue.pop(slot.user_id, None)
+        queue[slot.user_id] = slot
+        self._channels[guild_id] = channel
+        self._dirty.add(guild_id)
+        return len(queue)
+
+    def dequeue(self, guild_id: int, user_id: int):
+        queue = self._queues.get(guild_id)
+        if not queue or queue.pop(user_id, None) is None:
+            return False
+        if not queue:
+            del self._queues[guild_id]
+            self._channels.pop(guild_id, None)
+        return True
+
+    # ---- matching ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"❌ Error in matchmaking: {e}")
+
+    async def tick(self):
+        """Match every guild whose queue changed; returns the stacks posted"""
+        dirty, self._dirty = self._dirty, set()
+        posted = 0
+        for guild_id in dirty:
+            queue = self._queues.get(guild_id)
+            if not queue or len(queue) < 5:
+                continue
+            # players who joined a group since they queued give up their place
+            groups = self.instance.groups
+            for user_id in [user_id for user_id in queue if groups.groups_of(guild_id, user_id)]:
+                del queue[user_id]
+
+            stacks, leftover = form_stacks(list(queue.values()))
+            if not stacks:
+                continue
+            channel = self._channels[guild_id]
+            self._queues[guild_id] = {slot.user_id: slot for slot in leftover}
+            with rest_priority(NOTIFY):
+                results = await asyncio.gather(*(self._post(guild_id, channel, stack) for stack in stacks), return_exceptions=True)
+            for stack, result in zip(stacks, results):
+                if isinstance(result, Exception):
+                    print(f"❌ Failed to post matched group in guild {guild_id}: {result}")
+                    # back to the front of the queue for the next tick (leftover players may all have left it meanwhile)
+                    self._queues[guild_id] = {**{slot.user_id: slot for slot in stack}, **self._queues.get(guild_id, {})}
+                    self._channels[guild_id] = channel
+                    self._dirty.add(guild_id)
+                else:
+                    posted += 1
+                    self.stacks_formed += 1
+                    self.players_matched += 5
+            if stacks:
+                print(f"🧩 Matched {len(stacks)} group(s) in guild {guild_id}, {len(leftover)} player(s) still queued")
+        return posted
+
+    async def _post(self, guild_id: int, channel, stack):
+        from models.FiveManView import FiveManView  # not at the top: models import bot, which imports this module
+
+        bot_user = self.instance.bot.user
+        view = FiveManView(creator_id=bot_user.id if bot_user else 0, guild_id=guild_id)
+        view.channel_id = channel.id
+        view.apply_slots(stack)
+        self.instance.lifecycle.register(view)
+        try:
+            embed = view.update_embed()
+            mentions = " ".join(f"<@{slot.user_id}>" for slot in stack)
+            message = await channel.send(
+                content=f"🎉 **GROUP IS FULL!** {mentions}\nMatched from the queue - coordinate and have fun! 🎮",
+                embed=embed,
+                view=view.components(),
+                allowed_mentions=discord.AllowedMentions(users=True),
+            )
+        except Exception:
+            view.close_group()
+            raise
+        view.mark_sent(embed)
+        view.message_id = message.id
+        self.instance.groups.bind_message(view)
+        await self.instance.state.put(view.message_id, view.slots)
+        self.instance.group_store.record(view)
+        self.instance.message_ledger.add(guild_id, message, "group")
+        # the group message already pings the players; this only adds DMs when they're enabled
+        self.instance.notifier.group_ready(view, ping_channel=False)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+from datetime import timedelta
+
+import discord
+
+from bot.RestScheduler import CLEANUP, rest_priority
+
+# bulk delete only accepts messages younger than 14 days; keep a little margin
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_MAX_COUNT = 100
+
+
+class MessageCleaner:
+    """Deletes the bot's own messages across a guild.
+
+    Messages recorded in the MessageLedger are deleted by ID without reading any
+    history. Optionally, channels are also scanned (for messages posted before the
+    ledger existed) with bounded concurrency and a per-channel snowflake watermark,
+    so repeat scans only look at messages posted since the previous run. Messages
+    younger than 14 days always go through the bulk-delete endpoint.
+    """
+
+    def __init__(self, state_path: str, ledger=None, concurrency: int = 4, history_limit: int = 100):
+        self.state_path = state_path
+        self.ledger = ledger
+        self.concurrency = concurrency
+        self.history_limit = history_limit
+        self.watermarks = self._load()  # channel_id -> newest message id already scanned
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return {int(channel_id): message_id for channel_id, message_id in json.load(f).items()}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, watermarks):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({str(channel_id): message_id for channel_id, message_id in watermarks.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    async def clean_guild(self, guild: discord.Guild, bot_user, scan_history: bool = False, full: bool = False, keep=(), progress=None):
+        """Delete bot messages in a guild; returns the number deleted.
+
+        `keep` is a collection of message IDs to leave alone (e.g. open groups).
+        `progress` is an optional coroutine function called as progress(done, total, deleted).
+        """
+        keep = set(keep)
+        jobs = []
+        if self.ledger is not None:
+            for channel_id, message_ids in self.ledger.messages_for_guild(guild.id).items():
+                jobs.append(self._clean_ledger_channel(guild, channel_id, [mid for mid in message_ids if mid not in keep]))
+        if scan_history:
+            for channel in guild.text_channels:
+                permissions = channel.permissions_for(guild.me)
+                if permissions.read_message_history and permissions.manage_messages:
+                    jobs.append(self._clean_channel(channel, bot_user, full, keep))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        state = {"done": 0, "deleted": 0}
+
+        async def worker(job):
+            async with semaphore:
+                # history reads and deletes wait behind every other REST class
+                with rest_priority(CLEANUP):
+                    deleted = await job
+            state["done"] += 1
+            state["deleted"] += deleted
+            if progress:
+                await progress(state["done"], len(jobs), state["deleted"])
+
+        await asyncio.gather(*(worker(job) for job in jobs))
+        if scan_history:
+            await asyncio.to_thread(self._save, dict(self.watermarks))
+        return state["deleted"]
+
+    async def _clean_ledger_channel(self, guild, channel_id, message_ids):
+        if not message_ids:
+            return 0
+        channel = guild.get_channel(channel_id)
+        if channel is None:  # channel is gone, and its messages with it
+            for message_id in message_ids:
+                self.ledger.remove(guild.id, message_id)
+            return 0
+
+        try:
+            bulk = channel.permissions_for(guild.me).manage_messages
+            gone = await self._delete(channel, message_ids, bulk=bulk)
+        except discord.Forbidden:
+            return 0
+        except Exception as e:
+            print(f"❌ Error cleaning up #{channel.name} in {guild.name}: {e}")
+            return 0
+
+        for message_id in gone:
+            self.ledger.remove(guild.id, message_id)
+        return len(gone)
+
+    async def _clean_channel(self, channel, bot_user, full: bool, keep):
+        watermark = None if full else self.watermarks.get(channel.id)
+        history_kwargs = {"limit": self.history_limit}
+        if watermark:
+            history_kwargs["after"] = discord.Object(id=watermark)
+
+        newest = watermark or 0
+        own_message_ids = []
+        try:
+            async for message in channel.history(**history_kwargs):
+                newest = max(newest, message.id)
+                if message.author.id == bot_user.id and message.id not in keep:
+                    own_message_ids.append(message.id)
+
+            gone = await self._delete(channel, own_message_ids)
+        except discord.Forbidden:  # no permissions to read this channel / lost them mid-cleanup
+            return 0
+        except Exception as e:
+            print(f"❌ Error cleaning up #{channel.name} in {channel.guild.name}: {e}")
+            return 0
+
+        if newest:
+            self.watermarks[channel.id] = newest
+        if self.ledger is not None:
+            for message_id in gone:
+                self.ledger.remove(channel.guild.id, message_id)
+        if gone:
+            print(f"🧹 Cleaned up {len(gone)} old bot message(s) from #{channel.name} in {channel.guild.name}")
+        return len(gone)
+
+    async def _delete(self, channel, message_ids, bulk: bool = True):
+        """Delete messages by ID; returns the IDs that no longer exist"""
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        young, old = [], []
+        for message_id in message_ids:
+            if bulk and discord.utils.snowflake_time(message_id) > cutoff:
+                young.append(message_id)
+            else:
+                old.append(message_id)
+
+        gone = []
+        for start in range(0, len(young), BULK_DELETE_MAX_COUNT):
+            chunk = young[start:start + BULK_DELETE_MAX_COUNT]
+            try:
+                # single delete when the chunk has one message
+                await channel.delete_messages([discord.Object(id=message_id) for message_id in chunk])
+                gone.extend(chunk)
+            except discord.NotFound:  # some were already deleted; fall back to one by one
+                old.extend(chunk)
+
+        # too old for bulk delete (or no manage messages permission)
+        for message_id in old:
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except discord.NotFound:  # Message already deleted
+                pass
+            gone.append(message_id)
+        return gone
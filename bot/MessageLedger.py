@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import time
+
+
+class MessageLedger:
+    """On-disk record of every message the bot posts, indexed by guild.
+
+    Each line of the ledger file is a compact JSON array:
+        ["+", guild_id, channel_id, message_id, kind, created_at]   message posted
+        ["-", guild_id, message_id]                                   message deleted
+    Writes are buffered and appended off the event loop; the file is rewritten
+    without dead entries once they outnumber the live ones.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.by_guild = {}  # guild_id -> {message_id: (channel_id, kind, created_at)}
+        self._pending = []
+        self._dead = 0  # lines in the file that no longer describe a live message
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # torn write from a crash
+                        continue
+                    if entry[0] == "+":
+                        _, guild_id, channel_id, message_id, kind, created_at = entry
+                        self.by_guild.setdefault(guild_id, {})[message_id] = (channel_id, kind, created_at)
+                    elif entry[0] == "-":
+                        _, guild_id, message_id = entry
+                        if self.by_guild.get(guild_id, {}).pop(message_id, None) is not None:
+                            self._dead += 2
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        return sum(len(messages) for messages in self.by_guild.values())
+
+    def add(self, guild_id: int, message, kind: str):
+        """Remember a message the bot just sent"""
+        created_at = time.time()
+        self.by_guild.setdefault(guild_id, {})[message.id] = (message.channel.id, kind, created_at)
+        self._pending.append(["+", guild_id, message.channel.id, message.id, kind, created_at])
+
+    def remove(self, guild_id: int, message_id: int):
+        messages = self.by_guild.get(guild_id)
+        if not messages or messages.pop(message_id, None) is None:
+            return
+        if not messages:
+            del self.by_guild[guild_id]
+        self._pending.append(["-", guild_id, message_id])
+        self._dead += 2
+
+    def messages_for_guild(self, guild_id: int):
+        """Returns {channel_id: [message_id, ...]} for everything the bot posted in a guild"""
+        by_channel = {}
+        for message_id, (channel_id, kind, created_at) in self.by_guild.get(guild_id, {}).items():
+            by_channel.setdefault(channel_id, []).append(message_id)
+        return by_channel
+
+    # ---- background flushing ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to write message ledger: {e}")
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._dead > 1000 and self._dead > len(self):
+                self._pending = []
+                await asyncio.to_thread(self._rewrite, self._live_entries())
+                self._dead = 0
+            elif self._pending:
+                entries, self._pending = self._pending, []
+                await asyncio.to_thread(self._append, entries)
+
+    def _live_entries(self):
+        return [
+            ["+", guild_id, channel_id, message_id, kind, created_at]
+            for guild_id, messages in self.by_guild.items()
+            for message_id, (channel_id, kind, created_at) in messages.items()
+        ]
+
+    def _append(self, entries):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+
+    def _rewrite(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,193 @@
+import functools
+import time
+
+import aiohttp
+import discord
+
+import config
+from bot import instance
+from bot.InteractionDeadline import DeadlineResponse
+from bot.RestScheduler import ACK, rest_priority
+
+
+# handler latency buckets (seconds); 3s is Discord's interaction deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 3.0, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}  # label values -> count
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge:
+    """A value read from a callback at scrape time (use kind="counter" for monotonic totals).
+
+    With labels, the callback returns {label values tuple: value} instead of a single value.
+    """
+
+    def __init__(self, name: str, help: str, read, kind: str = "gauge", labels=()):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+        self.labels = tuple(labels)
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if not self.labels:
+            lines.append(f"{self.name} {value}")
+            return lines
+        for key, series_value in value.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {series_value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in self.series.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels + ('le',), key + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels + ('le',), key + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class Metrics:
+    """Process-wide metrics, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.handler_latency = Histogram(
+            "fivestack_handler_latency_seconds", "Time spent in a command/component handler", ("kind", "name")
+        )
+        self.interaction_age = Histogram(
+            "fivestack_interaction_age_seconds", "Time from interaction creation to handler completion", ("kind", "name")
+        )
+        self.handler_errors = Counter("fivestack_handler_errors_total", "Handlers that raised", ("kind", "name"))
+        self.rest_requests = Counter("fivestack_rest_requests_total", "Discord REST calls", ("method", "resource", "status"))
+        self.rest_rate_limited = Counter("fivestack_rest_429_total", "Discord REST calls answered with 429", ("method", "resource"))
+        self.interactions_deferred = Counter(
+            "fivestack_interactions_deferred_total", "Interactions deferred automatically because the handler ran past its budget", ("kind", "name")
+        )
+        self.interactions_missed = Counter(
+            "fivestack_interactions_missed_total", "Interactions that expired before they could be answered or deferred", ("kind", "name")
+        )
+        self.metrics = [
+            self.handler_latency, self.interaction_age, self.handler_errors, self.rest_requests, self.rest_rate_limited,
+            self.interactions_deferred, self.interactions_missed,
+        ]
+
+    def add_gauge(self, name: str, help: str, read, kind: str = "gauge", labels=()):
+        self.metrics.append(Gauge(name, help, read, kind, labels))
+
+    def add_histogram(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        histogram = Histogram(name, help, labels, buckets)
+        self.metrics.append(histogram)
+        return histogram
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def http_trace(self):
+        """aiohttp trace config that counts every REST call discord.py makes"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params):
+            # /api/v10/channels/123/messages -> channels
+            parts = params.url.path.split("/")
+            resource = parts[3] if len(parts) > 3 else ""
+            status = params.response.status
+            self.rest_requests.inc(method=params.method, resource=resource, status=status)
+            if status == 429:
+                self.rest_rate_limited.inc(method=params.method, resource=resource)
+
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+
+def timed(kind: str, name: str = None, defer: bool = True, ephemeral: bool = True):
+    """Record latency of an interaction handler and keep it inside Discord's 3s deadline:
+    async def handler(self, interaction, ...)
+
+    Components without an explicit name are labelled with their custom_id. Unless
+    `defer` is False (handlers that may answer with a modal), an interaction the
+    handler hasn't answered INTERACTION_DEFER_BUDGET seconds after it was created is
+    deferred for it and its later replies become followups (see DeadlineResponse);
+    `ephemeral` is the visibility of a deferred command's reply.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            started = time.perf_counter()
+            label = name or getattr(self, "custom_id", None) or func.__name__
+            deadline = None
+            if defer and config.INTERACTION_DEFER_BUDGET:
+                deadline = DeadlineResponse(interaction, config.INTERACTION_DEFER_BUDGET, ephemeral).install()
+            try:
+                # REST calls made while handling an interaction jump the scheduler queue
+                with rest_priority(ACK):
+                    return await func(self, interaction, *args, **kwargs)
+            except Exception:
+                if instance.bot_instance is not None:
+                    instance.bot_instance.metrics.handler_errors.inc(kind=kind, name=label)
+                raise
+            finally:
+                if deadline is not None:
+                    deadline.cancel()
+                if instance.bot_instance is not None:
+                    metrics = instance.bot_instance.metrics
+                    if deadline is not None and deadline.auto_deferred:
+                        metrics.interactions_deferred.inc(kind=kind, name=label)
+                        if deadline.missed:
+                            metrics.interactions_missed.inc(kind=kind, name=label)
+                    metrics.handler_latency.observe(time.perf_counter() - started, kind=kind, name=label)
+                    age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+                    metrics.interaction_age.observe(age, kind=kind, name=label)
+        return wrapper
+    return decorator
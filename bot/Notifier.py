@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import json
+import os
+import random
+import time
+
+import discord
+
+from bot.RestScheduler import NOTIFY, rest_priority
+
+
+class Notifier:
+    """Delivers "group is full" notifications (channel pings and optional DMs) off the interaction path.
+
+    Handlers only enqueue; a dispatcher task sends at most `concurrency` notifications
+    at once and retries 429s, 5xx responses and connection (or other non-HTTP) errors
+    with exponential backoff and jitter, giving up after `max_attempts`. Pending
+    notifications are kept in a small JSONL file so a restart resumes them, including
+    any that fail while closing (delivery is at least once):
+        ["+", id, kind, guild_id, target_id, content]   queued ("channel" or "dm")
+        ["-", id]                                        delivered or given up
+    """
+
+    def __init__(self, instance, path: str, concurrency: int = 4, max_attempts: int = 5, backoff: float = 1.0,
+                 max_backoff: float = 60.0, dms: bool = False, flush_interval: float = 2.0):
+        self.instance = instance
+        self.path = path
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.dms = dms
+        self.flush_interval = flush_interval
+        self._jobs = {}  # id -> {"id", "kind", "guild_id", "target", "content", "attempts"}
+        self._channels = {}  # id -> channel object given when queued (restored jobs use a partial messageable)
+        self._heap = []  # (due, id)
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight = set()
+        self._pending = []  # file entries not written yet
+        self._dead = 0
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._flush_task = None
+        self._closing = False
+        self._next_id = self._load() + 1
+
+        # counters
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _load(self):
+        last_id = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # torn write from a crash
+                        continue
+                    if entry[0] == "+":
+                        _, job_id, kind, guild_id, target, content = entry
+                        self._jobs[job_id] = {"id": job_id, "kind": kind, "guild_id": guild_id, "target": target, "content": content, "attempts": 0}
+                        last_id = max(last_id, job_id)
+                    elif entry[0] == "-" and self._jobs.pop(entry[1], None) is not None:
+                        self._dead += 2
+        except FileNotFoundError:
+            pass
+        for job_id in self._jobs:
+            self._heap.append((0, job_id))
+        if self._jobs:
+            print(f"📨 Resuming {len(self._jobs)} pending notification(s)")
+        return last_id
+
+    def __len__(self):
+        return len(self._jobs)
+
+    # ---- queueing (never awaits, safe to call from handlers) ----
+
+    def _add(self, kind: str, guild_id: int, target: int, content: str):
+        job_id = self._next_id
+        self._next_id += 1
+        self._jobs[job_id] = {"id": job_id, "kind": kind, "guild_id": guild_id, "target": target, "content": content, "attempts": 0}
+        self._pending.append(["+", job_id, kind, guild_id, target, content])
+        heapq.heappush(self._heap, (time.time(), job_id))
+        self._wakeup.set()
+        return job_id
+
+    def notify_channel(self, guild_id: int, channel, content: str):
+        self._channels[self._add("channel", guild_id, channel.id, content)] = channel
+
+    def notify_user(self, guild_id: int, user_id: int, content: str):
+        self._add("dm", guild_id, user_id, content)
+
+    def group_ready(self, view, ping_channel: bool = True):
+        """Queue the notifications for a group that just filled"""
+        user_ids = [slot.user_id for slot in view.slots if slot]
+        if ping_channel:
+            mentions = " ".join(f"<@{user_id}>" for user_id in user_ids)
+            self.notify_channel(
+                view.guild_id,
+                view.partial_message().channel,
+                f"🎉 **GROUP IS FULL!** {mentions}\nYour 5-man is ready to go! Coordinate and have fun! 🎮",
+            )
+        if self.dms:
+            for user_id in user_ids:
+                self.notify_user(view.guild_id, user_id, f"🎉 Your FiveStack group is full and ready to go! {view.jump_url}")
+
+    # ---- delivery ----
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self, timeout: float = 5.0):
+        """Give due notifications up to `timeout` seconds to go out; the rest stay queued on disk"""
+        self._closing = True
+        if self._task is not None:
+            deadline = time.time() + timeout
+            while (self._inflight or (self._heap and self._heap[0][0] <= time.time())) and time.time() < deadline:
+                await asyncio.sleep(0.05)
+            self._task.cancel()
+            for task in list(self._inflight):
+                task.cancel()
+            await asyncio.gather(self._task, *self._inflight, return_exceptions=True)
+            self._task = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                await self._semaphore.acquire()  # bounded: wait for a free sender
+                task = asyncio.create_task(self._deliver(job))
+                self._inflight.add(task)
+                task.add_done_callback(self._delivered)
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _delivered(self, task):
+        self._inflight.discard(task)
+        self._semaphore.release()
+
+    async def _deliver(self, job):
+        try:
+            with rest_priority(NOTIFY):
+                await self._send(job)
+        except (discord.Forbidden, discord.NotFound) as e:  # DMs closed, channel gone: retrying won't help
+            self._give_up(job, e)
+        except discord.HTTPException as e:
+            if self._closing or e.status == 429 or e.status >= 500:
+                self._retry(job, e, getattr(e, "retry_after", 0))
+            else:
+                self._give_up(job, e)
+        except Exception as e:
+            # connection errors, or the HTTP session going away under a shutdown: nothing says the
+            # notification is undeliverable, so keep it (on disk, if we're closing) and try again
+            self._retry(job, e)
+        else:
+            self.sent += 1
+            self._finish(job)
+
+    async def _send(self, job):
+        bot = self.instance.bot
+        if job["kind"] == "channel":
+            channel = self._channels.get(job["id"]) or bot.get_partial_messageable(job["target"], guild_id=job["guild_id"])
+            message = await channel.send(job["content"], allowed_mentions=discord.AllowedMentions(users=True))
+            self.instance.message_ledger.add(job["guild_id"], message, "full")
+        else:
+            dm = await bot.create_dm(discord.Object(id=job["target"]))
+            await dm.send(job["content"])
+
+    def _retry(self, job, error, retry_after: float = 0):
+        if self._closing:  # stays in the file and resumes on the next start
+            return
+        job["attempts"] += 1
+        if job["attempts"] >= self.max_attempts:
+            self._give_up(job, error)
+            return
+        self.retried += 1
+        delay = min(self.max_backoff, self.backoff * 2 ** (job["attempts"] - 1)) * random.uniform(0.5, 1.5)
+        heapq.heappush(self._heap, (time.time() + max(delay, retry_after or 0), job["id"]))
+        self._wakeup.set()
+
+    def _give_up(self, job, error):
+        self.failed += 1
+        print(f"❌ Dropping {job['kind']} notification {job['id']} for guild {job['guild_id']}: {error}")
+        self._finish(job)
+
+    def _finish(self, job):
+        if self._jobs.pop(job["id"], None) is None:
+            return
+        self._channels.pop(job["id"], None)
+        self._pending.append(["-", job["id"]])
+        self._dead += 2
+
+    # ---- persistence ----
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to write notification queue: {e}")
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._dead > 200 and self._dead > len(self._jobs):
+                self._pending = []
+                entries = [["+", job["id"], job["kind"], job["guild_id"], job["target"], job["content"]] for job in self._jobs.values()]
+                await asyncio.to_thread(self._rewrite, entries)
+                self._dead = 0
+            elif self._pending:
+                entries, self._pending = self._pending, []
+                await asyncio.to_thread(self._append, entries)
+
+    def _append(self, entries):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+
+    def _rewrite(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+        os.replace(tmp_path, self.path)
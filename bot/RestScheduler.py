@@ -0,0 +1,197 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+
+
+# priority classes, most urgent first
+ACK = 0  # bot-token calls made while an interaction handler is running (3s deadline)
+EDIT = 1  # group embed edits
+NOTIFY = 2  # announcements, "group is full" pings, DMs
+CLEANUP = 3  # cleanup-messages deletes and history scans
+CLASS_NAMES = ("ack", "edit", "notify", "cleanup")
+
+_priority = contextvars.ContextVar("rest_priority", default=NOTIFY)
+_route = contextvars.ContextVar("rest_route", default=None)  # bucket key of the call being sent, read by the response hook
+
+
+@contextmanager
+def rest_priority(priority: int):
+    """Run REST calls made in this block (and tasks it starts) at the given class"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# starting guesses at Discord's per-route limits (requests, per seconds), replaced per route by what the
+# X-RateLimit-* response headers report; each (route, channel/guild) pair gets its own bucket
+ROUTE_LIMITS = {
+    ("POST", "/channels/{channel_id}/messages"): (5, 5.0),
+    ("PATCH", "/channels/{channel_id}/messages/{message_id}"): (5, 5.0),
+    ("DELETE", "/channels/{channel_id}/messages/{message_id}"): (5, 1.0),
+    ("POST", "/channels/{channel_id}/messages/bulk-delete"): (1, 1.0),
+    ("GET", "/channels/{channel_id}/messages"): (5, 1.0),
+}
+DEFAULT_LIMIT = (5, 5.0)
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated", "waiters", "pump")
+
+    def __init__(self, capacity: int, per: float):
+        self.capacity = capacity
+        self.rate = capacity / per  # tokens per second
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.waiters = []  # (priority, seq, future)
+        self.pump = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float):
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def learn(self, limit: int, per: float, remaining: int, now: float):
+        """Follow Discord's count for this bucket (and its size, when the window is known)"""
+        self._refill(now)
+        if per:  # a fresh window: Discord's count replaces ours
+            self.capacity, self.rate = limit, limit / per
+            self.tokens = float(remaining)
+        else:
+            self.tokens = min(self.tokens, remaining)
+
+    def wait_time(self):
+        return (1 - self.tokens) / self.rate
+
+    @property
+    def idle(self):
+        return not self.waiters and self.tokens >= self.capacity
+
+
+class RestScheduler:
+    """Orders outbound Discord REST calls by priority class and spaces them with local token buckets.
+
+    Every call takes a token from its route bucket (per route and channel/guild) and
+    from a process-wide bucket (`global_rate` per second), so the bot stays under
+    Discord's limits instead of discovering them through 429s. Route buckets start
+    from ROUTE_LIMITS and follow the X-RateLimit-* headers of their responses: the
+    remaining count on every response, and the route's limit and window from the
+    first call of a window (Remaining = Limit - 1, so Reset-After is the whole window).
+    When a bucket is empty, waiters are released strictly by class (ACK, EDIT, NOTIFY,
+    CLEANUP), FIFO within a class. The class comes from rest_priority(): interaction
+    handlers run at ACK, the edit coalescer at EDIT, the notifier at NOTIFY and the
+    message cleaner at CLEANUP. Interaction callbacks and followups use the
+    interaction token, are not bucketed with bot calls and bypass the scheduler.
+    """
+
+    def __init__(self, global_rate: float = 50.0, max_buckets: int = 4096):
+        self.global_bucket = TokenBucket(global_rate, 1.0) if global_rate else None
+        self.max_buckets = max_buckets
+        self._buckets = {}  # (method, path, major parameters) -> TokenBucket
+        self.route_limits = dict(ROUTE_LIMITS)  # (method, path) -> (requests, per seconds), learned from responses
+        self._seq = itertools.count()
+
+        # per class, indexed like CLASS_NAMES
+        self.queued = [0] * len(CLASS_NAMES)  # calls waiting for a token right now
+        self.scheduled = [0] * len(CLASS_NAMES)
+        self.delayed = [0] * len(CLASS_NAMES)  # calls that had to wait at all
+        self.wait_histogram = None  # Metrics histogram labelled by class, set by FiveStack
+
+    def _bucket(self, method: str, path: str, major: str):
+        key = (method, path, major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                # buckets that are full and unused behave exactly like new ones
+                self._buckets = {key: bucket for key, bucket in self._buckets.items() if not bucket.idle}
+            bucket = self._buckets[key] = TokenBucket(*self.route_limits.get((method, path), DEFAULT_LIMIT))
+        return bucket
+
+    async def acquire(self, method: str, path: str, major: str = "", priority: int = None):
+        """Wait until a call on this route may be sent"""
+        priority = _priority.get() if priority is None else priority
+        started = time.monotonic()
+        await self._take(self._bucket(method, path, major), priority)
+        if self.global_bucket is not None:
+            await self._take(self.global_bucket, priority)
+        waited = time.monotonic() - started
+        self.scheduled[priority] += 1
+        if waited > 0.001:
+            self.delayed[priority] += 1
+        if self.wait_histogram is not None:
+            self.wait_histogram.observe(waited, **{"class": CLASS_NAMES[priority]})
+
+    async def _take(self, bucket: TokenBucket, priority: int):
+        if not bucket.waiters and bucket.try_take(time.monotonic()):
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(bucket.waiters, (priority, next(self._seq), future))
+        if bucket.pump is None:
+            bucket.pump = asyncio.create_task(self._pump(bucket))
+        self.queued[priority] += 1
+        try:
+            await future
+        finally:
+            self.queued[priority] -= 1
+
+    async def _pump(self, bucket: TokenBucket):
+        """Hand tokens to the most urgent waiter as they refill"""
+        try:
+            while bucket.waiters:
+                if not bucket.try_take(time.monotonic()):
+                    await asyncio.sleep(bucket.wait_time())
+                    continue
+                _, _, future = heapq.heappop(bucket.waiters)
+                if future.done():  # caller was cancelled while waiting
+                    bucket.tokens += 1
+                    continue
+                future.set_result(None)
+        finally:
+            bucket.pump = None
+
+    async def on_request_end(self, session, context, params):
+        """aiohttp trace hook: update the call's bucket from Discord's rate limit headers"""
+        key = _route.get()
+        headers = params.response.headers
+        if key is None or "X-RateLimit-Global" in headers:
+            return
+        try:
+            limit = int(headers["X-RateLimit-Limit"])
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_after = float(headers["X-RateLimit-Reset-After"])
+        except (KeyError, ValueError):  # routes without a per-route limit
+            return
+        per = None
+        if remaining == limit - 1 and reset_after > 0:
+            per = reset_after
+            self.route_limits[key[:2]] = (limit, per)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.learn(limit, per, remaining, time.monotonic())
+
+    def install(self, http):
+        """Route every bot-token REST call made by a discord.py HTTPClient through the scheduler"""
+        request = http.request
+
+        async def scheduled_request(route, **kwargs):
+            await self.acquire(route.method, route.path, route.major_parameters)
+            token = _route.set((route.method, route.path, route.major_parameters))
+            try:
+                return await request(route, **kwargs)
+            finally:
+                _route.reset(token)
+
+        http.request = scheduled_request
+        # the client's aiohttp trace (Metrics.http_trace) also feeds the response headers back
+        if http.http_trace is not None:
+            http.http_trace.on_request_end.append(self.on_request_end)
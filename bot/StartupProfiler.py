@@ -0,0 +1,60 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Per-phase startup timings (imports, cog load, login, first READY, command sync)"""
+
+    def __init__(self, started_at: float = None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.timings = {}  # phase -> seconds, in the order phases finished
+        self._open = {}  # phase -> perf_counter at start
+        self.finished = False
+
+    def record(self, name: str, seconds: float):
+        self.timings[name] = seconds
+
+    def start(self, name: str):
+        self._open[name] = time.perf_counter()
+
+    def end(self, name: str):
+        started = self._open.pop(name, None)
+        if started is not None:
+            self.record(name, time.perf_counter() - started)
+
+    @contextmanager
+    def phase(self, name: str):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def report(self):
+        total = self.timings.get("total") or (time.perf_counter() - self.started_at)
+        lines = ["⏱️ Startup profile:"]
+        for name, seconds in self.timings.items():
+            if name == "total":
+                continue
+            share = seconds / total * 100 if total else 0
+            lines.append(f"  {name:<14} {seconds * 1000:8.1f}ms {share:5.1f}%")
+        lines.append(f"  {'total':<14} {total * 1000:8.1f}ms")
+        return "\n".join(lines)
+
+    def finish(self, path: str = None):
+        """Close the profile at first READY; print it and append it to `path` as a JSON line"""
+        if self.finished:
+            return
+        self.finished = True
+        self.record("total", time.perf_counter() - self.started_at)
+        print(self.report())
+        if path:
+            entry = {
+                "timestamp": time.time(),
+                "release": os.getenv("RELEASE", ""),
+                "timings_ms": {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+            }
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
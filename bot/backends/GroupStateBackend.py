@@ -0,0 +1,87 @@
+from models.Slot import Slot
+
+
+class GroupStateBackend:
+    """Storage for each group's slots, shared by every replica using the same backend.
+
+    Implementations provide get / put / compare_and_swap / delete; a group's state is
+    a (version, slots) pair where the version increases on every write and slots is a
+    list of models.Slot records (or None for a free slot). The slot
+    operations below are built on compare_and_swap, so two replicas can never seat
+    two users in the same slot. They only change groups the backend already has
+    (stored with put or seed): an absent group was closed or expired, so they
+    return None for its slots instead of recreating it.
+    """
+
+    max_retries = 20
+
+    async def get(self, key: int):
+        """Returns (version, slots), or None if the group is unknown"""
+        raise NotImplementedError
+
+    async def put(self, key: int, slots: list):
+        """Unconditionally store slots; returns the new version"""
+        raise NotImplementedError
+
+    async def compare_and_swap(self, key: int, expected_version: int, slots: list):
+        """Store slots only if the current version is expected_version (0 = group absent)"""
+        raise NotImplementedError
+
+    async def delete(self, key: int):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    # ---- atomic slot operations ----
+
+    async def _update(self, key: int, change):
+        """Apply change(slots) -> (result, new_slots or None) with optimistic retries; (None, None) if the group is absent"""
+        for _ in range(self.max_retries):
+            current = await self.get(key)
+            if current is None:
+                return None, None
+            version, slots = current
+            result, new_slots = change(list(slots))
+            if new_slots is None:
+                return result, slots
+            if await self.compare_and_swap(key, version, new_slots):
+                return result, new_slots
+        raise RuntimeError(f"Too much contention updating group {key}")
+
+    async def seed(self, key: int, slots: list):
+        """Store slots if the backend doesn't know the group yet; returns the authoritative slots"""
+        if await self.compare_and_swap(key, 0, slots):
+            return slots
+        current = await self.get(key)
+        return current[1] if current else slots
+
+    async def claim_slot(self, key: int, member: Slot):
+        """Seat member in the first free slot; returns (index or None, slots or None if the group is absent)"""
+        def change(slots):
+            if any(slot and slot.user_id == member.user_id for slot in slots):
+                return None, None
+            for index, slot in enumerate(slots):
+                if slot is None:
+                    slots[index] = member
+                    return index, slots
+            return None, None
+        return await self._update(key, change)
+
+    async def release_slot(self, key: int, user_id: int):
+        """Free the user's slot; returns (index or None, slots or None if the group is absent)"""
+        def change(slots):
+            for index, slot in enumerate(slots):
+                if slot and slot.user_id == user_id:
+                    slots[index] = None
+                    return index, slots
+            return None, None
+        return await self._update(key, change)
+
+    async def reset(self, key: int):
+        """Empty every slot; returns the new slots, or None if the group is absent"""
+        def change(slots):
+            if all(slot is None for slot in slots):
+                return None, None
+            return None, [None] * len(slots)
+        return (await self._update(key, change))[1]
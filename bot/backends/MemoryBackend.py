@@ -0,0 +1,28 @@
+from bot.backends.GroupStateBackend import GroupStateBackend
+
+
+class MemoryBackend(GroupStateBackend):
+    """In-process state (default); atomic because every call runs on the event loop"""
+
+    def __init__(self):
+        self.groups = {}  # key -> (version, slots)
+
+    async def get(self, key: int):
+        current = self.groups.get(key)
+        if current is None:
+            return None
+        return current[0], list(current[1])
+
+    async def put(self, key: int, slots: list):
+        version = self.groups.get(key, (0, None))[0] + 1
+        self.groups[key] = (version, list(slots))
+        return version
+
+    async def compare_and_swap(self, key: int, expected_version: int, slots: list):
+        if self.groups.get(key, (0, None))[0] != expected_version:
+            return False
+        self.groups[key] = (expected_version + 1, list(slots))
+        return True
+
+    async def delete(self, key: int):
+        self.groups.pop(key, None)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from urllib.parse import urlparse
+
+from bot.backends.GroupStateBackend import GroupStateBackend
+from models.Slot import slots_from_json, slots_to_json
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(GroupStateBackend):
+    """State in any server speaking the Redis protocol (RESP2).
+
+    Uses a small built-in client so no extra dependency is needed. Each group is a
+    JSON value {"version": n, "slots": [...]}; compare_and_swap runs
+    WATCH/GET/MULTI/SET/EXEC on a single connection guarded by a lock.
+    """
+
+    def __init__(self, url: str, key_prefix: str = "fivestack:group:", ttl: int = None):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self.ttl = ttl  # seconds after the last write; abandoned groups expire on their own (None = never)
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    # ---- protocol ----
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", self.db)
+
+    async def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def _command(self, *commands):
+        """Run commands back to back on the connection, reconnecting once if it dropped"""
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    return [await self._send(*command) for command in commands]
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self._writer = None
+                    if attempt:
+                        raise
+
+    def _key(self, key: int):
+        return f"{self.key_prefix}{key}"
+
+    # ---- backend interface ----
+
+    async def get(self, key: int):
+        (raw,) = await self._command(("GET", self._key(key)))
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["version"], slots_from_json(data["slots"])
+
+    async def put(self, key: int, slots: list):
+        # a lone write still has to bump the version atomically, so go through CAS
+        for _ in range(self.max_retries):
+            current = await self.get(key)
+            version = current[0] if current else 0
+            if await self.compare_and_swap(key, version, slots):
+                return version + 1
+        raise RuntimeError(f"Too much contention writing group {key}")
+
+    async def compare_and_swap(self, key: int, expected_version: int, slots: list):
+        redis_key = self._key(key)
+        value = json.dumps({"version": expected_version + 1, "slots": slots_to_json(slots)}, separators=(",", ":"))
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    await self._send("WATCH", redis_key)
+                    raw = await self._send("GET", redis_key)
+                    version = json.loads(raw)["version"] if raw is not None else 0
+                    if version != expected_version:
+                        await self._send("UNWATCH")
+                        return False
+                    await self._send("MULTI")
+                    await self._send("SET", redis_key, value, *(("EX", self.ttl) if self.ttl else ()))
+                    result = await self._send("EXEC")
+                    return result is not None  # nil reply: the key changed after WATCH
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self._writer = None
+                    if attempt:
+                        raise
+
+    async def delete(self, key: int):
+        await self._command(("DEL", self._key(key)))
+
+    async def close(self):
+        async with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
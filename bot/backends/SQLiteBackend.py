@@ -0,0 +1,58 @@
+import asyncio
+import json
+import sqlite3
+import threading
+
+from bot.backends.GroupStateBackend import GroupStateBackend
+from models.Slot import slots_from_json, slots_to_json
+
+
+class SQLiteBackend(GroupStateBackend):
+    """State in a SQLite database in WAL mode, shared by processes on the same host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS groups (key INTEGER PRIMARY KEY, version INTEGER NOT NULL, slots TEXT NOT NULL)"
+        )
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.rowcount, cursor.fetchone()
+
+    async def get(self, key: int):
+        _, row = await asyncio.to_thread(self._execute, "SELECT version, slots FROM groups WHERE key = ?", (key,))
+        if row is None:
+            return None
+        return row[0], slots_from_json(json.loads(row[1]))
+
+    async def put(self, key: int, slots: list):
+        _, row = await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO groups (key, version, slots) VALUES (?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET version = version + 1, slots = excluded.slots RETURNING version",
+            (key, json.dumps(slots_to_json(slots))),
+        )
+        return row[0]
+
+    async def compare_and_swap(self, key: int, expected_version: int, slots: list):
+        if expected_version == 0:
+            sql = "INSERT OR IGNORE INTO groups (key, version, slots) VALUES (?, 1, ?)"
+            params = (key, json.dumps(slots_to_json(slots)))
+        else:
+            sql = "UPDATE groups SET version = version + 1, slots = ? WHERE key = ? AND version = ?"
+            params = (json.dumps(slots_to_json(slots)), key, expected_version)
+        rowcount, _ = await asyncio.to_thread(self._execute, sql, params)
+        return rowcount == 1
+
+    async def delete(self, key: int):
+        await asyncio.to_thread(self._execute, "DELETE FROM groups WHERE key = ?", (key,))
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
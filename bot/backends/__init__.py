@@ -0,0 +1,17 @@
+from .GroupStateBackend import GroupStateBackend
+from .MemoryBackend import MemoryBackend
+
+
+def create_backend(name: str, sqlite_path: str = None, redis_url: str = None, redis_ttl: int = None):
+    """Build the group state backend selected by GROUP_STATE_BACKEND"""
+    # the optional backends are only imported when selected
+    if name == "sqlite":
+        from .SQLiteBackend import SQLiteBackend
+        return SQLiteBackend(sqlite_path)
+    if name == "redis":
+        from .RedisBackend import RedisBackend
+        return RedisBackend(redis_url, ttl=redis_ttl)
+    return MemoryBackend()
+
+
+__all__ = ['GroupStateBackend', 'MemoryBackend', 'create_backend']
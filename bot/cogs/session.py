@@ -1,13 +1,23 @@
+import asyncio
 import time
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
-from bot import FiveStack, get_bot
+from bot import get_bot
+from bot.Metrics import timed
+from bot.InteractionDeadline import send_or_edit
 from models.FiveManView import FiveManView
+from models.QueueView import QueueView
+from models.GroupRouterView import GroupRouterView
+from ui.RoleSelect import RoleSelect
+from ui.RoleCancelButton import RoleCancelButton
+from ui.TimeModal import TimeModal
 import config
 
 
+STATUS_MAX_GROUPS = 15  # groups listed by session-status
+
+
 class Session(commands.Cog):
     
     
@@ -20,29 +30,50 @@ class Session(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.instance = get_bot()
+        # the queue panel has no per-message state, so one view serves every panel
+        self.bot.add_view(QueueView())
+        # likewise one router view serves the buttons of every group message (groups are found by message ID)
+        self.bot.add_view(GroupRouterView())
+        # role menus and availability modals are stateless: their custom_ids name the group, resolved per interaction
+        self.bot.add_dynamic_items(RoleSelect, RoleCancelButton)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # discord.py drops submits of modals it doesn't hold; TimeModals are sent without being held
+        if interaction.type is not discord.InteractionType.modal_submit:
+            return
+        modal = TimeModal.from_interaction(interaction)
+        if modal is not None:
+            await modal.on_submit(interaction)
 
     @session_group.command(name="session-status", description="Check current session status")
+    @timed("command", "session-status")
     async def session_status(self, interaction: discord.Interaction):
         """Debug command to check session status"""
         guild_id = interaction.guild_id
-        current_active_group = self.instance.active_groups.get(guild_id)
+        groups = self.instance.groups.in_guild(guild_id)
         
-        if current_active_group:
-            filled_count = sum(1 for slot in current_active_group.slots if slot)
-            session_age = time.time() - current_active_group.created_at
-            session_minutes = int(session_age / 60)
-            last_refresh_age = int((time.time() - current_active_group.last_refresh) / 60)
+        if groups:
+            now = time.time()
+            lines = [f"📊 **Session Status for {interaction.guild.name}:**", f"• Active groups: {len(groups)}"]
+            for group in groups[:STATUS_MAX_GROUPS]:
+                session_minutes = int((now - group.created_at) / 60)
+                last_refresh_age = int((now - group.last_refresh) / 60)
+                lines.append(
+                    f"• <#{group.channel_id}> {len(group.member_ids())}/5 - created {session_minutes} minutes ago "
+                    f"by <@{group.creator_id}>, last refresh {last_refresh_age} minutes ago"
+                )
+            if len(groups) > STATUS_MAX_GROUPS:
+                lines.append(f"• ...and {len(groups) - STATUS_MAX_GROUPS} more")
             
-            await interaction.response.send_message(
-                f"📊 **Session Status for {interaction.guild.name}:**\n"
-                f"• Active group: Yes\n"
-                f"• Members: {filled_count}/5\n"
-                f"• Age: {session_minutes} minutes\n"
-                f"• Last refresh: {last_refresh_age} minutes ago\n"
-                f"• Creator: <@{current_active_group.creator_id}>\n"
-                f"• Closed: {'Yes' if current_active_group.is_closed else 'No'}",
-                ephemeral=True
-            )
+            queued = self.instance.matchmaker.queued(guild_id)
+            if queued:
+                lines.append(f"• Queued players: {queued}")
+            joined = self.instance.groups.groups_of(guild_id, interaction.user.id)
+            if joined:
+                lines.append("• You're in: " + ", ".join(group.jump_url for group in joined))
+            
+            await interaction.response.send_message("\n".join(lines), ephemeral=True)
         else:
             await interaction.response.send_message(
                 f"📊 No active session found for {interaction.guild.name}.", 
@@ -50,46 +81,59 @@ class Session(commands.Cog):
             )
 
     @session_group.command(name="fivestack", description="Start a five stack!")
+    @timed("command", "fivestack")
     async def five_man_command_impl(self, interaction: discord.Interaction):
         guild_id = interaction.guild_id
+        view = None
         
         try:
-            # Check if there's already an active group in this guild
-            current_active_group = self.instance.active_groups.get(guild_id)
-            if current_active_group and not current_active_group.is_closed:
+            # Check how many groups are already open here
+            groups = self.instance.groups
+            if config.MAX_GROUPS_PER_CHANNEL and groups.count_in_channel(guild_id, interaction.channel_id) >= config.MAX_GROUPS_PER_CHANNEL:
+                await interaction.response.send_message(
+                    f"❌ This channel already has {config.MAX_GROUPS_PER_CHANNEL} open five stack(s)!\n"
+                    "Join one of them, or close one first.",
+                    ephemeral=True
+                )
+                return
+            if config.MAX_GROUPS_PER_GUILD and groups.count_in_guild(guild_id) >= config.MAX_GROUPS_PER_GUILD:
                 await interaction.response.send_message(
-                    "❌ There's already an active five stack in this server! Only one group can be active at a time.\n"
-                    "Close the group that is open first.",
+                    f"❌ This server already has {config.MAX_GROUPS_PER_GUILD} open five stack(s)!\n"
+                    "Join one of them, or close one first.",
                     ephemeral=True
                 )
                 return
             
-            # RESPOND IMMEDIATELY - nothing before this line should be slow
-            await interaction.response.send_message("⏳ Creating your FiveStack group...", ephemeral=True)
+            # acknowledge before the slow part; if @timed already deferred (the checks above ran long),
+            # fill its "thinking" placeholder instead of sending a followup the edit below would never replace
+            await send_or_edit(interaction, "⏳ Creating your FiveStack group...", ephemeral=True)
             
             # Now do the slower operations
             view = FiveManView(creator_id=interaction.user.id, guild_id=guild_id)
-            self.instance.active_groups[guild_id] = view
+            view.channel_id = interaction.channel_id
+            # counts against the limits now; bind_message below indexes it by message ID for the router view
+            self.instance.lifecycle.register(view)
             
             embed = view.update_embed()
             
-            # Add persistent view to bot
-            self.bot.add_view(view)
-            
-            # Find role
-            role = discord.utils.get(interaction.guild.roles, name="league-of-legends")
-            ping = role.mention if role else ""
+            # cached per guild, rebuilt when the ping role changes
+            ping = self.instance.guild_metadata.ping_mention(interaction.guild)
             
             # Send FiveStack message
             channel = interaction.channel
             fivestack_message = await channel.send(
                 content=f"{ping} – New FiveStack group forming! 🎮",
                 embed=embed,
-                view=view
+                view=view.components()
             )
             
-            # Store the message reference
-            view.original_message = fivestack_message
+            # Store the message reference (IDs only, so the group doesn't keep the Message alive)
+            view.mark_sent(embed)
+            view.message_id = fivestack_message.id
+            self.instance.groups.bind_message(view)
+            await self.instance.state.put(view.message_id, view.slots)
+            self.instance.group_store.record(view)
+            self.instance.message_ledger.add(guild_id, fivestack_message, "group")
             
             # Update the ephemeral response
             await interaction.edit_original_response(content="✅ FiveStack created successfully!")
@@ -99,60 +143,68 @@ class Session(commands.Cog):
             import traceback
             traceback.print_exc()  # This will show the full error
             
+            # the message never went out, free the guild for another try
+            if view is not None and not view.message_id:
+                view.close_group()
+            
+            # If already responded (or deferred), edit that response
+            await send_or_edit(interaction, "❌ Failed to create fivestack. Please try again.", ephemeral=True)
+
+    @session_group.command(name="queue", description="Post a matchmaking queue that forms role-complete groups")
+    @timed("command", "queue", ephemeral=False)
+    async def queue_command(self, interaction: discord.Interaction):
+        try:
+            await interaction.response.send_message(embed=QueueView.build_embed(), view=QueueView.rendered())
+        except Exception as e:
+            print(f"Error in queue command: {e}")
             if not interaction.response.is_done():
-                await interaction.response.send_message("❌ Failed to create fivestack. Please try again.", ephemeral=True)
-            else:
-                # If already responded, use edit
-                await interaction.edit_original_response(content="❌ Failed to create fivestack. Please try again.")
+                await interaction.response.send_message("❌ Failed to post the queue. Please try again.", ephemeral=True)
 
-    @session_group.command(name="reset-fivestack", description="Reset the bot for this guild (clears active FiveStack group)")
+    @session_group.command(name="reset-fivestack", description="Reset the bot for this guild (clears all active FiveStack groups)")
+    @timed("command", "reset-fivestack")
     async def reset_guild_command(self, interaction: discord.Interaction):
         guild_id = interaction.guild_id
         
         try:
-            # Check if there's an active group
-            if guild_id not in self.instance.active_groups:
+            # Check if there are active groups
+            groups = self.instance.groups.in_guild(guild_id)
+            if not groups:
                 await interaction.response.send_message(
                     "ℹ️ No active FiveStack group found for this guild. Nothing to reset.",
                     ephemeral=True
                 )
                 return
             
-            current_group = self.instance.active_groups[guild_id]
-            
-            if hasattr(current_group, 'is_closed'):
-                current_group.is_closed = True
+            # Stop views to prevent further interactions and remove them from the registry
+            for current_group in groups:
+                current_group.close_group()
             
-            # Stop view to prevent further interactions
-            if hasattr(current_group, 'stop'):
-                current_group.stop()
-            
-            # Disable the original message's view (if message reference exists)
-            if hasattr(current_group, 'original_message') and current_group.original_message:
-                try:
-                    await current_group.original_message.edit(
-                        content=f"{current_group.original_message.content}\n\n❌ **This FiveStack has been reset by an administrator.**",
-                        view=None  # Remove the view entirely
-                    )
-                except discord.NotFound:  # Message was deleted, OK
-                    pass
-                except discord.Forbidden:  # Bot doesn't have permission to edit, OK
-                    pass
+            async def disable_message(current_group):
+                # Disable the original message's view (if message reference exists)
+                await self.instance.edit_coalescer.settle(current_group)
+                message = current_group.partial_message()
+                if message is not None:
+                    # groups only keep the message's IDs, so the notice replaces the content
+                    try:
+                        await message.edit(
+                            content="❌ **This FiveStack has been reset by an administrator.**",
+                            view=None  # Remove the view entirely
+                        )
+                    except discord.NotFound:  # Message was deleted, OK
+                        pass
+                    except discord.Forbidden:  # Bot doesn't have permission to edit, OK
+                        pass
+                if current_group.message_id:
+                    await self.instance.state.delete(current_group.message_id)
             
-            # Remove from active groups
-            del self.instance.active_groups[guild_id]
+            await asyncio.gather(*(disable_message(current_group) for current_group in groups))
             await interaction.response.send_message(
                 f"✅ **Guild FiveStack reset successfully!**\n"
-                f"The active group has been cleared and you can now create a new FiveStack.",
+                f"{len(groups)} active group(s) cleared; you can now create a new FiveStack.",
                 ephemeral=True
             )
             print(f"Guild {guild_id} FiveStack reset by user {interaction.user.id} ({interaction.user.display_name})")
             
-        except KeyError:
-            await interaction.response.send_message(
-                "ℹ️ No active FiveStack group found for this guild.",
-                ephemeral=True
-            )
         except Exception as e:
             print(f"Error in reset command: {e}")
             import traceback
@@ -165,60 +217,44 @@ class Session(commands.Cog):
                 )
 
     @session_group.command(name="cleanup-messages", description="Delete all old FiveStack messages (requires manage messages permission)")
-    async def cleanup_command(self, interaction: discord.Interaction):
+    @app_commands.describe(
+        scan_history="Also scan channel history for bot messages posted before the message ledger existed",
+        full="With scan_history: rescan recent history instead of only messages since the last cleanup",
+    )
+    @timed("command", "cleanup-messages")
+    async def cleanup_command(self, interaction: discord.Interaction, scan_history: bool = False, full: bool = False):
         """Manual cleanup command for slash command interface"""
         await interaction.response.defer(ephemeral=True)  # Defer response because it might take a long time    
         try:
-            deleted_total = 0
             guild = interaction.guild
-            # Loop through all channels the bot can see in this guild
-            for channel in guild.text_channels:
-                # Check if bot has permission to read message history and delete messages
-                permissions = channel.permissions_for(guild.me)
-                if not (permissions.read_message_history and permissions.manage_messages):
-                    continue
+            progress_message = await interaction.followup.send("🧹 Starting cleanup...", ephemeral=True, wait=True)
+            last_update = time.monotonic()
+            
+            async def report_progress(done, total, deleted):
+                nonlocal last_update
+                # throttle progress edits so they don't compete with the deletes
+                if done < total and time.monotonic() - last_update < 2:
+                    return
+                last_update = time.monotonic()
                 try:
-                    deleted_count = 0
-                    async for message in channel.history(limit=20): 
-                        if message.author == self.bot.user:
-                            try:
-                                await message.delete()
-                                deleted_count += 1
-                                # Add delay between deletions to avoid rate limiting
-                                await asyncio.sleep(0.5)  # 500ms delay between deletions
-                            except discord.NotFound:  # Message already deleted
-                                pass
-                            except discord.Forbidden:  # Lost permissions mid-cleanup
-                                break
-                            except discord.HTTPException as e:
-                                if e.status == 429:  # Rate limited
-                                    print(f"⏳ Rate limited, waiting...")
-                                    await asyncio.sleep(2)  # Wait 2 seconds on rate limit
-                                    continue
-                                else:
-                                    raise
-                    
-                    if deleted_count > 0:
-                        print(f"🧹 Cleaned up {deleted_count} old bot message(s) from #{channel.name} in {guild.name}")
-                        deleted_total += deleted_count
-                    
-                    # Add delay between channels
-                    if deleted_count > 0:
-                        await asyncio.sleep(1)  # 1 second delay between channels that had deletions
-                        
-                except discord.Forbidden:  # No permissions to read this channel
-                    continue
-                except Exception as e:
-                    print(f"❌ Error cleaning up #{channel.name} in {guild.name}: {e}")
+                    await progress_message.edit(content=f"🧹 Scanned {done}/{total} channel(s), {deleted} message(s) deleted so far...")
+                except discord.HTTPException:
+                    pass
+            
+            # leave the messages of groups that are still open
+            keep = [group.message_id for group in self.instance.groups.in_guild(guild.id) if group.message_id and not group.is_closed]
+            deleted_total = await self.instance.message_cleaner.clean_guild(
+                guild, self.bot.user, scan_history=scan_history, full=full, keep=keep, progress=report_progress
+            )
             
             # Send appropriate follow ups
             if deleted_total > 0:
-                await interaction.followup.send(f"🧹 Total cleanup: {deleted_total} message(s) deleted from this server")
+                await progress_message.edit(content=f"🧹 Total cleanup: {deleted_total} message(s) deleted from this server")
             else:
-                await interaction.followup.send("✅ No old bot messages found to clean up in this server")
+                await progress_message.edit(content="✅ No old bot messages found to clean up in this server")
             
         except Exception as e:
-            await interaction.followup.send(f"❌ Error during message cleanup: {e}")
+            await interaction.followup.send(f"❌ Error during message cleanup: {e}", ephemeral=True)
 
 
 # Setup function to allow load_extension
@@ -24,4 +24,89 @@ intents.guilds = True
 intents.members = True
 
 # Bot configuration
-BOT_COMMAND_PREFIX = "/"
\ No newline at end of file
+BOT_COMMAND_PREFIX = "/"
+
+# discord.py's message cache: full Message objects kept for edit/delete events (default 1000, as in discord.py);
+# 0 turns it off, which the bot itself doesn't need (see the README's Message Cache section)
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", "1000")) or None  # discord.py reads 0 as 1000, None as no cache
+
+# Startup
+CORE_COGS = [cog.strip() for cog in os.getenv("CORE_COGS", "bot.cogs.session").split(",") if cog.strip()]  # loaded before connecting
+DEFERRED_COGS = [cog.strip() for cog in os.getenv("DEFERRED_COGS", "").split(",") if cog.strip()]  # loaded at the first READY, before the command sync
+STARTUP_VERBOSE = os.getenv("STARTUP_VERBOSE", "false").lower() == "true"  # print every loaded command
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() == "true"  # append phase timings to STARTUP_REPORT_FILE
+STARTUP_REPORT_FILE = os.getenv("STARTUP_REPORT_FILE", "startup_timings.jsonl")
+
+# Slash command sync: only when the command tree hash changes
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", "command_tree_hash.json")
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "false").lower() == "true"
+# dev only: comma-separated guild IDs to sync to per guild (instant updates) instead of globally
+DEV_GUILD_IDS = [int(guild_id) for guild_id in os.getenv("DEV_GUILD_IDS", "").split(",") if guild_id.strip()] if BOT_ENV != "prod" else []
+
+# Group persistence (snapshot + append-only journal)
+SESSION_DATA_FILE = os.getenv("SESSION_DATA_FILE", "session_data.json")
+SESSION_JOURNAL_FILE = os.getenv("SESSION_JOURNAL_FILE", "session_journal.jsonl")
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "2"))  # seconds between journal flushes
+SESSION_COMPACT_EVERY = int(os.getenv("SESSION_COMPACT_EVERY", "500"))  # journal entries before writing a snapshot
+
+# Group message edits are coalesced to at most one per message per window (seconds)
+EDIT_COALESCE_WINDOW = float(os.getenv("EDIT_COALESCE_WINDOW", "1.0"))
+
+# Role pinged when a group is created (looked up by name, cached per guild)
+PING_ROLE_NAME = os.getenv("PING_ROLE_NAME", "league-of-legends")
+
+# "Group is full" notifications: sent off the interaction path, retried on 429/5xx, queued in NOTIFY_QUEUE_FILE across restarts
+NOTIFY_QUEUE_FILE = os.getenv("NOTIFY_QUEUE_FILE", "notify_queue.jsonl")
+NOTIFY_DMS = os.getenv("NOTIFY_DMS", "false").lower() == "true"  # also DM every member
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "4"))  # notifications in flight at once
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+
+# Seconds a Join click holds an open slot while the player picks a role and availability
+SLOT_RESERVATION_TTL = float(os.getenv("SLOT_RESERVATION_TTL", "60"))
+
+# Interactions a handler hasn't answered this many seconds after creation are deferred for it (Discord allows 3); 0 = never
+INTERACTION_DEFER_BUDGET = float(os.getenv("INTERACTION_DEFER_BUDGET", "2"))
+
+# Outbound REST scheduler: bot-wide requests per second before calls queue by priority (ack > edit > notify > cleanup); 0 = disabled
+REST_GLOBAL_RATE = float(os.getenv("REST_GLOBAL_RATE", "50"))
+
+# Open groups allowed at once per channel / per guild; 0 = no limit
+MAX_GROUPS_PER_CHANNEL = int(os.getenv("MAX_GROUPS_PER_CHANNEL", "3"))
+MAX_GROUPS_PER_GUILD = int(os.getenv("MAX_GROUPS_PER_GUILD", "10"))
+
+# Time zone for availability entries that don't name one ("7PM to 9PM" -> this zone)
+AVAILABILITY_TIMEZONE = os.getenv("AVAILABILITY_TIMEZONE", "America/New_York")
+
+# Queue mode: seconds between matchmaking passes over the guilds whose queue changed
+MATCHMAKING_INTERVAL = float(os.getenv("MATCHMAKING_INTERVAL", "5"))
+
+# Groups expire (buttons disabled, view dropped) this many seconds after creation / after the last slot change; 0 = never
+GROUP_MAX_AGE = float(os.getenv("GROUP_MAX_AGE", str(12 * 3600)))
+GROUP_IDLE_TIMEOUT = float(os.getenv("GROUP_IDLE_TIMEOUT", str(3 * 3600)))
+
+# /5stack cleanup-messages
+MESSAGE_LEDGER_FILE = os.getenv("MESSAGE_LEDGER_FILE", "message_ledger.jsonl")  # every message the bot has posted
+CLEANUP_STATE_FILE = os.getenv("CLEANUP_STATE_FILE", "cleanup_watermarks.json")  # per-channel scan watermarks
+CLEANUP_CONCURRENCY = int(os.getenv("CLEANUP_CONCURRENCY", "4"))  # channels scanned at once
+CLEANUP_HISTORY_LIMIT = int(os.getenv("CLEANUP_HISTORY_LIMIT", "100"))  # messages read per channel per run
+
+# Sharding / cluster mode
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))  # >0 runs an AutoShardedBot; 0 = unsharded (Discord's recommendation in cluster mode)
+CLUSTER_COUNT = int(os.getenv("CLUSTER_COUNT", "1"))  # worker processes started by main.py; >1 enables cluster mode
+CLUSTER_IDENTIFY_INTERVAL = float(os.getenv("CLUSTER_IDENTIFY_INTERVAL", "5"))  # seconds per shard between worker starts
+CLUSTER_RESTART_BACKOFF = float(os.getenv("CLUSTER_RESTART_BACKOFF", "5"))  # initial delay before restarting a crashed worker
+CLUSTER_RESTART_BACKOFF_MAX = float(os.getenv("CLUSTER_RESTART_BACKOFF_MAX", "300"))
+CLUSTER_SHUTDOWN_TIMEOUT = float(os.getenv("CLUSTER_SHUTDOWN_TIMEOUT", "15"))  # seconds workers get to flush state on shutdown before being killed
+
+# Group slot state shared between replicas: "memory" (default), "sqlite" or "redis"
+GROUP_STATE_BACKEND = os.getenv("GROUP_STATE_BACKEND", "memory").lower()
+GROUP_STATE_SQLITE_PATH = os.getenv("GROUP_STATE_SQLITE_PATH", "group_state.db")
+GROUP_STATE_REDIS_URL = os.getenv("GROUP_STATE_REDIS_URL", "redis://localhost:6379/0")
+
+# Prometheus-style /metrics endpoint (0 = disabled); cluster workers use METRICS_PORT + cluster id
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Opt-in interaction trace for bench/replay.py (empty = disabled); IDs are salted hashes
+INTERACTION_TRACE_FILE = os.getenv("INTERACTION_TRACE_FILE", "")
+INTERACTION_TRACE_SALT = os.getenv("INTERACTION_TRACE_SALT") or None  # random per process if unset
@@ -1,19 +1,23 @@
+import time
+STARTED_AT = time.perf_counter()  # before the heavy imports, for the startup profile
+
 import discord
-from discord.ext import commands, tasks
 import asyncio
-import os
-import json
-import time
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from bot import FiveStack, set_bot
+import glob
+import multiprocessing
+import signal
+from bot import set_bot
 
 from bot.FiveStack import FiveStack
+from bot.GroupStore import GroupStore
+from bot.StartupProfiler import StartupProfiler
 from config import *
 
-import bot
 import config
 
+profiler = StartupProfiler(started_at=STARTED_AT)
+profiler.record("imports", time.perf_counter() - STARTED_AT)
+
 # ...
 # dictionary to track active groups per guild
 # active_groups = {}  # guild_id hashes to the appropriate FiveManView
@@ -66,27 +70,199 @@ import config
 
 
 
-async def main():
-    print("🚀 Starting bot initialization...")
+async def main(cluster_id: int = 0, shard_ids: list = None, shard_count: int = None):
+    print(f"🚀 Starting bot initialization ({config.BOT_ENV})...")
     # Load all Cogs
-    fiveStack = FiveStack()
+    fiveStack = FiveStack(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count, profiler=profiler)
     set_bot(fiveStack)
     bot = fiveStack.bot
     print("✅ FiveStack instance created")
     
+    # SIGTERM (docker stop, the cluster supervisor) closes the bot, which flushes state before the HTTP session goes
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(bot.close()))
+    except NotImplementedError:  # Windows event loops have no signal handlers
+        pass
+    
 
     # Optionally add your FiveStack Cog directly if not in ./cogs
     # await bot.add_cog(FiveStack(bot))
 
     # Run the bot
     print("🔄 Loading cogs...")
-    await fiveStack.load_cogs()
+    with profiler.phase("cog_load"):
+        await fiveStack.load_cogs()
     print("✅ Successfully loaded cogs")
+    
+    # Warm restore of groups saved before the last shutdown
+    with profiler.phase("restore"):
+        restored = fiveStack.restore_groups()
+        await fiveStack.sync_group_state()
+    print(f"♻️ Restored {restored} group(s)")
+    await fiveStack.start_background_tasks()
+    
     print("🔗 Starting bot connection...")
-    await bot.start(DISCORD_TOKEN)  # ✅ async-friendly
+    try:
+        # same as bot.start(), split so login and the wait for READY are timed separately
+        with profiler.phase("login"):
+            await bot.login(DISCORD_TOKEN)
+        profiler.start("first_ready")  # ended by on_ready
+        await bot.connect()
+    finally:
+        # stops the background tasks first (see FiveStack._stop_before_close); a no-op if SIGTERM already closed it
+        await bot.close()
     print("🔗 Began bot!")
 
 
+# ---- cluster mode: one supervisor process, CLUSTER_COUNT worker processes ----
+
+def run_worker(cluster_id: int, shard_ids: list, shard_count: int):
+    """Entry point of a worker process"""
+    try:
+        asyncio.run(main(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count))
+    except KeyboardInterrupt:
+        pass
+
+
+async def fetch_recommended_shard_count():
+    client = discord.Client(intents=config.intents)
+    try:
+        await client.login(DISCORD_TOKEN)
+        shards, _, _ = await client.http.get_bot_gateway()
+        return shards
+    finally:
+        await client.close()
+
+
+def assign_shards(shard_count: int, cluster_count: int):
+    """Split shard IDs into contiguous blocks, one per worker"""
+    per_cluster, extra = divmod(shard_count, cluster_count)
+    assignments, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = per_cluster + (1 if cluster_id < extra else 0)
+        assignments.append(list(range(start, start + size)))
+        start += size
+    return [shard_ids for shard_ids in assignments if shard_ids]
+
+
+def saved_group_files():
+    """(snapshot, journal) pairs left by earlier runs: the single-process files and every cluster's"""
+    cluster_ids = set()
+    for base in (config.SESSION_DATA_FILE, config.SESSION_JOURNAL_FILE):
+        prefix, suffix = FiveStack.cluster_file(base, "*").split("*")
+        for path in glob.glob(glob.escape(prefix) + "*" + glob.escape(suffix)):
+            cluster_id = path[len(prefix):len(path) - len(suffix)]
+            if cluster_id.isdigit():
+                cluster_ids.add(int(cluster_id))
+    files = [(config.SESSION_DATA_FILE, config.SESSION_JOURNAL_FILE)]
+    for cluster_id in sorted(cluster_ids):
+        files.append((FiveStack.cluster_file(config.SESSION_DATA_FILE, cluster_id), FiveStack.cluster_file(config.SESSION_JOURNAL_FILE, cluster_id)))
+    return files
+
+
+def repartition_groups(shard_count: int = None, assignments: list = None):
+    """Move saved groups into the files of the workers that own their guilds now (before any worker starts).
+
+    Groups are persisted per worker, and guild ownership follows the shard count,
+    which can change between restarts (Discord's recommendation, or CLUSTER_COUNT);
+    without this, groups of guilds that moved would sit in a file nobody restores.
+    """
+    if assignments is None:  # one process owns every guild
+        targets = {0: (config.SESSION_DATA_FILE, config.SESSION_JOURNAL_FILE)}
+        owner_of = lambda record: 0
+    else:
+        targets = {
+            cluster_id: (FiveStack.cluster_file(config.SESSION_DATA_FILE, cluster_id), FiveStack.cluster_file(config.SESSION_JOURNAL_FILE, cluster_id))
+            for cluster_id in range(len(assignments))
+        }
+        cluster_of_shard = {shard_id: cluster_id for cluster_id, shard_ids in enumerate(assignments) for shard_id in shard_ids}
+        owner_of = lambda record: cluster_of_shard[(record.get("guild_id", 0) >> 22) % shard_count]
+    moved = GroupStore.repartition(saved_group_files(), targets, owner_of)
+    if moved:
+        print(f"📦 Moved {moved} saved group(s) to the worker that now owns their guild")
+
+
+def run_cluster(cluster_count: int, shard_count: int):
+    """Start one worker per shard block and restart any that exit"""
+    if not shard_count:
+        shard_count = asyncio.run(fetch_recommended_shard_count())
+        print(f"🧮 Discord recommends {shard_count} shard(s)")
+    shard_count = max(shard_count, cluster_count)  # every worker owns at least one shard
+    assignments = assign_shards(shard_count, cluster_count)
+    repartition_groups(shard_count, assignments)
+    ctx = multiprocessing.get_context("spawn")
+    
+    workers = {}  # cluster_id -> Process
+    backoff = {}  # cluster_id -> delay before the next restart
+    started_at = {}  # cluster_id -> monotonic start time
+    restart_at = {}  # cluster_id -> monotonic time a crashed worker may restart
+    
+    def start_worker(cluster_id):
+        process = ctx.Process(
+            target=run_worker,
+            args=(cluster_id, assignments[cluster_id], shard_count),
+            name=f"fivestack-cluster-{cluster_id}",
+        )
+        process.start()
+        workers[cluster_id] = process
+        started_at[cluster_id] = time.monotonic()
+        print(f"🧩 Cluster {cluster_id} started (pid {process.pid}, shards {assignments[cluster_id]})")
+    
+    try:
+        for cluster_id in range(len(assignments)):
+            start_worker(cluster_id)
+            # stagger starts so workers don't all IDENTIFY at once
+            if cluster_id < len(assignments) - 1:
+                time.sleep(config.CLUSTER_IDENTIFY_INTERVAL * len(assignments[cluster_id]))
+        
+        while True:
+            time.sleep(1)
+            now = time.monotonic()
+            for cluster_id, process in list(workers.items()):
+                if process.is_alive():
+                    # a worker that stayed up for a while gets its backoff reset
+                    if now - started_at[cluster_id] > config.CLUSTER_RESTART_BACKOFF_MAX:
+                        backoff.pop(cluster_id, None)
+                    continue
+                
+                if cluster_id not in restart_at:
+                    delay = backoff.get(cluster_id, config.CLUSTER_RESTART_BACKOFF)
+                    backoff[cluster_id] = min(delay * 2, config.CLUSTER_RESTART_BACKOFF_MAX)
+                    restart_at[cluster_id] = now + delay
+                    print(f"💥 Cluster {cluster_id} exited with code {process.exitcode}, restarting in {delay:.0f}s")
+                elif now >= restart_at[cluster_id]:
+                    del restart_at[cluster_id]
+                    start_worker(cluster_id)
+    except KeyboardInterrupt:
+        print("🛑 Stopping cluster...")
+    finally:
+        # SIGTERM lets each worker flush its group journal and message ledger; kill whatever outlives the timeout
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + config.CLUSTER_SHUTDOWN_TIMEOUT
+        for process in workers.values():
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+        for cluster_id, process in workers.items():
+            if process.is_alive():
+                print(f"⚠️ Cluster {cluster_id} didn't stop within {config.CLUSTER_SHUTDOWN_TIMEOUT:.0f}s, killing it")
+                process.kill()
+                process.join()
+
+
+def stop_cluster(signum, frame):
+    raise KeyboardInterrupt  # same shutdown path as Ctrl+C
+
+
 if __name__ == "__main__":
-    # Run the bot asynchronously
-    asyncio.run(main())
\ No newline at end of file
+    if config.CLUSTER_COUNT > 1:
+        signal.signal(signal.SIGTERM, stop_cluster)
+        run_cluster(config.CLUSTER_COUNT, config.SHARD_COUNT)
+    elif config.SHARD_COUNT > 0:
+        # single process owning every shard
+        repartition_groups()
+        asyncio.run(main(shard_ids=list(range(config.SHARD_COUNT)), shard_count=config.SHARD_COUNT))
+    else:
+        # Run the bot asynchronously
+        repartition_groups()
+        asyncio.run(main())
@@ -0,0 +1,197 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import config
+
+
+NOW = "now"
+DEFAULT_LENGTH = timedelta(hours=3)  # "after 8", "now", "8pm": free for this long
+
+# what players type -> IANA zone (EST/EDT both mean US Eastern local time, DST included)
+ZONE_NAMES = {
+    "utc": "UTC", "gmt": "UTC",
+    "est": "America/New_York", "edt": "America/New_York", "et": "America/New_York", "eastern": "America/New_York",
+    "cst": "America/Chicago", "cdt": "America/Chicago", "ct": "America/Chicago", "central": "America/Chicago",
+    "mst": "America/Denver", "mdt": "America/Denver", "mt": "America/Denver", "mountain": "America/Denver",
+    "pst": "America/Los_Angeles", "pdt": "America/Los_Angeles", "pt": "America/Los_Angeles", "pacific": "America/Los_Angeles",
+    "bst": "Europe/London", "cet": "Europe/Berlin", "cest": "Europe/Berlin", "eet": "Europe/Athens", "eest": "Europe/Athens",
+    "ist": "Asia/Kolkata", "jst": "Asia/Tokyo", "kst": "Asia/Seoul", "aest": "Australia/Sydney", "aedt": "Australia/Sydney",
+}
+
+_ZONE = re.compile(r"\b(?:(utc|gmt)\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?|(" + "|".join(ZONE_NAMES) + r"))\b")
+_CLOCK = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a|p)?"
+_START = re.compile(r"^(?:after|from|at|around|starting|~)?\s*(?:" + _CLOCK + r"|(now|asap|rn|right now|anytime))(?:\s*(?:ish|onwards?|on|\+))?$")
+_UNTIL = re.compile(r"^(?:until|till|til|before|by)\s*" + _CLOCK + r"$")
+_RANGE = re.compile(r"^(?:from\s*)?(?:" + _CLOCK + r"|(now|asap|rn))\s*(?:-|–|to|until|till|til)\s*" + _CLOCK + r"$")
+
+
+def _clock(hour, minute, meridiem):
+    """(hour, minute, meridiem) -> minutes after midnight; without am/pm a 12-hour time stays ambiguous (AM, PM) tuple"""
+    hour, minute = int(hour), int(minute or 0)
+    if hour > 24 or minute > 59:
+        raise ValueError
+    if meridiem:
+        if hour > 12:
+            raise ValueError
+        return (hour % 12 + (12 if meridiem.startswith("p") else 0)) * 60 + minute
+    if hour > 12 or hour == 0:  # 24-hour clock
+        return (hour % 24) * 60 + minute
+    return (hour % 12 * 60 + minute, (hour % 12 + 12) * 60 + minute)
+
+
+def _after(start, candidates):
+    """The candidate (minutes of day) closest after start"""
+    return min(candidates, key=lambda minutes: (minutes - start) % 1440 or 1440)
+
+
+def _evening(candidates):
+    """Lone ambiguous clock times mean the evening ("after 8" -> 8PM, "after 12" -> midnight): this is a gaming bot"""
+    if not isinstance(candidates, tuple):
+        return candidates
+    am, pm = candidates
+    return am if pm == 12 * 60 else pm
+
+
+@lru_cache(maxsize=4096)
+def parse_phrase(text: str):
+    """Parse a normalized availability phrase into (start, end, zone), or None.
+
+    start is NOW or minutes after local midnight, end is minutes after local
+    midnight (an (AM, PM) pair when "until 2" can't tell yet) or None
+    (DEFAULT_LENGTH after start), zone is an IANA name, a UTC
+    offset in minutes or None (AVAILABILITY_TIMEZONE). Independent of the current
+    time, so the same few phrases are parsed once and shared by every group.
+    """
+    zone = None
+    match = _ZONE.search(text)
+    if match:
+        if match.group(1):
+            offset = int(match.group(3)) * 60 + int(match.group(4) or 0)
+            zone = offset if match.group(2) == "+" else -offset
+        else:
+            zone = ZONE_NAMES[match.group(5)]
+        text = (text[:match.start()] + text[match.end():]).strip()
+    text = text.replace(".", "").strip()
+
+    try:
+        match = _RANGE.match(text)
+        if match:
+            end = _clock(*match.group(5, 6, 7))
+            if match.group(4):
+                return NOW, end, zone
+            start = _clock(*match.group(1, 2, 3))
+            if isinstance(start, tuple) and isinstance(end, tuple):
+                start = _evening(start)
+            elif isinstance(start, tuple):  # "7-9pm": the start that comes before the end
+                start = min(start, key=lambda minutes: (end - minutes) % 1440 or 1440)
+            if isinstance(end, tuple):  # "10-2": the end that comes first after the start
+                end = _after(start, end)
+            return start, end, zone
+
+        match = _UNTIL.match(text)
+        if match:
+            return NOW, _clock(*match.group(1, 2, 3)), zone
+
+        match = _START.match(text)
+        if match:
+            if match.group(4):
+                return NOW, None, zone
+            return _evening(_clock(*match.group(1, 2, 3))), None, zone
+    except ValueError:
+        return None
+    return None
+
+
+@lru_cache(maxsize=None)
+def _tzinfo(zone):
+    if zone is None:
+        zone = config.AVAILABILITY_TIMEZONE
+    if isinstance(zone, int):
+        return timezone(timedelta(minutes=zone))
+    try:
+        return ZoneInfo(zone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def parse_availability(text: str, now: float = None):
+    """Availability text -> (start, end) as UTC epoch seconds, or None if it can't be read.
+
+    Clock times are placed on the next occurrence that hasn't ended yet, so "7PM to
+    9PM" typed at 10PM means tomorrow; ranges past midnight end the next day.
+    """
+    if not text:
+        return None
+    phrase = parse_phrase(" ".join(text.lower().split()))
+    if phrase is None:
+        return None
+    start, end, zone = phrase
+    now = time.time() if now is None else now
+    local_now = datetime.fromtimestamp(now, _tzinfo(zone))
+    midnight = local_now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    begin = local_now if start is NOW else midnight + timedelta(minutes=start)
+    if end is None:
+        finish = begin + DEFAULT_LENGTH
+    else:
+        if isinstance(end, tuple):  # "until 2" at 11PM means 2AM
+            end = _after(begin.hour * 60 + begin.minute, end)
+        finish = midnight + timedelta(minutes=end)
+        while finish <= begin:
+            finish += timedelta(days=1)
+    if finish <= local_now:  # already over today
+        begin += timedelta(days=1)
+        finish += timedelta(days=1)
+    return begin.timestamp(), finish.timestamp()
+
+
+class AvailabilityWindow:
+    """The time every member with a readable availability is free.
+
+    Joining intersects the window with the new interval; leaving only recomputes
+    it when the leaving member bounded it.
+    """
+
+    __slots__ = ("_intervals", "start", "end")
+
+    def __init__(self):
+        self._intervals = {}  # user_id -> (start, end)
+        self.start = None
+        self.end = None
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, user_id: int, interval):
+        if user_id in self._intervals:
+            self.remove(user_id)
+        self._intervals[user_id] = interval
+        if len(self._intervals) == 1:
+            self.start, self.end = interval
+        else:
+            self.start = max(self.start, interval[0])
+            self.end = min(self.end, interval[1])
+
+    def remove(self, user_id: int):
+        interval = self._intervals.pop(user_id, None)
+        if interval is None:
+            return
+        if not self._intervals:
+            self.start = self.end = None
+        elif interval[0] == self.start or interval[1] == self.end:
+            self.start = max(start for start, _ in self._intervals.values())
+            self.end = min(end for _, end in self._intervals.values())
+
+    def intervals(self):
+        """user_id -> (start, end) of every member counted in the window"""
+        return dict(self._intervals)
+
+    @property
+    def overlap(self):
+        """(start, end) everyone is free, or None if there is no common time"""
+        if self._intervals and self.start < self.end:
+            return self.start, self.end
+        return None
@@ -1,47 +1,98 @@
 
+import asyncio
 import time
 import discord
 
-import bot
-from ui.SlotButton import SlotButton
-from ui.ResetButton import ResetButton
-from ui.LeaveButton import LeaveButton
-from ui.CloseButton import CloseButton
+import config
 
 from bot.instance import get_bot
+from models.Slot import slots_from_json, slots_to_json
+from models.Availability import AvailabilityWindow, parse_availability
+from models.SlotReservations import SlotReservations
 
 
-class FiveManView(discord.ui.View):
+# shared by every group with no players, so empty groups don't each carry an index
+_NO_MEMBERS = {}
+
+
+# one group's state; its message's buttons are served by the shared GroupRouterView, so groups hold no discord.py view
+class FiveManView:
     def __init__(self, creator_id: int, guild_id: int):
-        super().__init__(timeout=None)
         self.creator_id = creator_id
         self.guild_id = guild_id
-        self.original_message = None
+        self.channel_id = None
+        self.message_id = None  # with channel_id, all a group keeps of its message (edits go through partial_message)
         self.is_closed = False
         self.created_at = time.time()
         self.last_refresh = time.time()
         
-        self.slots = [None] * 5
-        self.add_item(SlotButton())
-        self.add_item(ResetButton())
-        self.add_item(LeaveButton())
-        self.add_item(CloseButton())
+        self.slots = (None,) * 5  # Slot or None; replaced, never mutated
+        self._members = _NO_MEMBERS  # user_id -> slot index
+        self._availability = None  # AvailabilityWindow, created on the first readable availability
+        self._reservations = None  # SlotReservations, created on the first Join click
+        self._reservation_sweep = None  # TimerHandle for the earliest hold's expiry, one per group
+        self.registry = None  # GroupRegistry holding this group, kept in sync with the members
+        self._version = 0  # bumped on every slot change
+        self._rendered = None  # (version, embed, serialized embed)
+        self._last_sent = None  # serialized embed currently shown on the message
+    
+    # rebuild a view from a record saved by GroupStore
+    @classmethod
+    def from_record(cls, record: dict):
+        view = cls(creator_id=record["creator_id"], guild_id=record["guild_id"])
+        view.channel_id = record["channel_id"]
+        view.message_id = record["message_id"]
+        view.is_closed = record.get("is_closed", False)
+        view.created_at = record.get("created_at", view.created_at)
+        # availability as parsed when each player joined: re-reading "now" or "until 2" at restore would move it
+        slots = slots_from_json(record.get("slots") or [])
+        saved = record.get("availability")
+        if saved is not None:
+            intervals = {int(user_id): tuple(interval) for user_id, interval in saved.items()}
+        else:  # saved before intervals were: read relative times as of the group's creation
+            intervals = {slot.user_id: parse_availability(slot.time, view.created_at) for slot in slots if slot and slot.time}
+        view.apply_slots(slots, intervals)
+        view.last_refresh = record.get("last_refresh", view.created_at)  # after apply_slots, which bumps it
+        return view
+    
+    # serializable snapshot of the group (same shape as session_data.json)
+    def to_record(self):
+        intervals = self._availability.intervals() if self._availability else {}
+        return {
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "creator_id": self.creator_id,
+            "slots": slots_to_json(self.slots),
+            "is_closed": self.is_closed,
+            "created_at": self.created_at,
+            "last_refresh": self.last_refresh,
+            "availability": {str(user_id): list(interval) for user_id, interval in intervals.items()},
+        }
     
-    # function to mark group as closed and clear guild reference
+    # the buttons to send with the group message (disabled once the group is closed or expired)
+    @staticmethod
+    def components(disabled: bool = False):
+        from models.GroupRouterView import GroupRouterView  # not at the top: its buttons import this module
+        return GroupRouterView.rendered(disabled)
+    
+    # function to mark group as closed and drop it from the bot
     def close_group(self):
-        global active_groups
         self.is_closed = True
-        if self.guild_id in active_groups and active_groups[self.guild_id] == self:
-            del active_groups[self.guild_id]
+        get_bot().lifecycle.unregister(self)
     
     def is_user_already_joined(self, user: discord.User):
-        return any(slot and slot["user_id"] == user.id for slot in self.slots if slot)
+        return user.id in self._members
     
     def get_user_slot(self, user: discord.User):
-        for i, slot in enumerate(self.slots):
-            if slot and slot["user_id"] == user.id:
-                return i
-        return None
+        return self._members.get(user.id)
+    
+    def member_ids(self):
+        return self._members.keys()
+    
+    @property
+    def jump_url(self):
+        return f"https://discord.com/channels/{self.guild_id}/{self.channel_id}/{self.message_id}"
     
     # return index of the first empty slot, or none if full
     def get_first_available_slot(self):
@@ -51,20 +102,156 @@ class FiveManView(discord.ui.View):
         return None
     
     def is_full(self):
-        return all(slot is not None for slot in self.slots)
+        return len(self._members) == 5
+    
+    # hold an open slot for a player from Join until TimeModal submits (or extend their hold); False if every open slot is held
+    def reserve_slot(self, user_id: int):
+        if self._reservations is None:
+            self._reservations = SlotReservations(config.SLOT_RESERVATION_TTL)
+        had_hold = self._reservations.holds(user_id)
+        if not self._reservations.reserve(user_id, 5 - len(self._members)):
+            return False
+        if not had_hold:
+            self._version += 1
+        # holds abandoned in a dismissed menu or modal leave the embed when they run out;
+        # a pending sweep is never later than this hold (same ttl), so it only needs one when idle
+        if self._reservation_sweep is None:
+            self._schedule_reservation_sweep()
+        return True
+    
+    def _schedule_reservation_sweep(self):
+        expires_at = self._reservations.next_expiry()
+        if expires_at is None or self.is_closed:
+            self._reservation_sweep = None
+            return
+        delay = max(0.0, expires_at - time.monotonic())
+        self._reservation_sweep = asyncio.get_running_loop().call_later(delay, self._expire_reservations)
+    
+    def _expire_reservations(self):
+        if self._reservations.prune() and not self.is_closed:
+            self._version += 1
+            get_bot().edit_coalescer.mark_dirty(self)
+        # renewed holds, or a timer that fired a little early: sweep again at the earliest remaining expiry
+        self._schedule_reservation_sweep()
+    
+    # returns True if the player held a slot (the embed changed)
+    def release_reservation(self, user_id: int):
+        if self._reservations is None or not self._reservations.release(user_id):
+            return False
+        self._version += 1
+        return True
+    
+    # a player may take a slot if they hold one, or if a slot is open beyond everyone else's holds
+    def can_claim(self, user_id: int):
+        if self._reservations is None or self._reservations.holds(user_id):
+            return True
+        return self._reservations.others(user_id) < 5 - len(self._members)
+    
+    def reserved_count(self):
+        if not self._reservations:
+            return 0
+        if self._reservations.prune():
+            self._version += 1
+        return len(self._reservations)
+    
+    # slot changes go through here (with the state backend's copy) so the render cache knows the state changed;
+    # intervals (user_id -> parsed availability) skips re-reading the text of a restored group
+    def apply_slots(self, slots, intervals=None):
+        slots = (tuple(slots) + (None,) * 5)[:5]
+        if slots != self.slots:
+            old_members, old_slots = self._members, self.slots
+            self.slots = slots
+            self._members = {slot.user_id: index for index, slot in enumerate(slots) if slot} or _NO_MEMBERS
+            if self.registry is not None:
+                self.registry.members_changed(self, old_members.keys(), self._members.keys())
+            self._update_availability(old_slots, slots, intervals or {})
+            if self._reservations:
+                # a player who got a slot no longer needs their hold
+                for user_id in self._members:
+                    self._reservations.release(user_id)
+            self._version += 1
+            self.last_refresh = time.time()  # pushes back idle expiry
+    
+    # joins intersect the common window, leaves only recompute it if the leaver bounded it
+    def _update_availability(self, old_slots, new_slots, intervals):
+        old = {slot.user_id: slot.time for slot in old_slots if slot and slot.time}
+        new = {slot.user_id: slot.time for slot in new_slots if slot and slot.time}
+        if old == new:
+            return
+        window = self._availability
+        if window is not None:
+            for user_id, text in old.items():
+                if new.get(user_id) != text:
+                    window.remove(user_id)
+        for user_id, text in new.items():
+            if old.get(user_id) != text:
+                interval = intervals[user_id] if user_id in intervals else parse_availability(text)
+                if interval is not None:
+                    if window is None:
+                        window = self._availability = AvailabilityWindow()
+                    window.add(user_id, interval)
+    
+    # (start, end) every member who gave a readable time is free, None if there is none, False if they don't overlap
+    def common_availability(self):
+        if not self._availability:
+            return None
+        return self._availability.overlap or False
+    
+    async def sync_state(self):
+        if not self.message_id:
+            return
+        current = await get_bot().state.get(self.message_id)
+        if current is not None:
+            self.apply_slots(current[1])
     
     def update_embed(self):
-        filled_count = sum(1 for slot in self.slots if slot)
+        self.reserved_count()  # expired holds bump the version
+        if self._rendered is not None and self._rendered[0] == self._version:
+            return self._rendered[1]
+        embed = self._build_embed()
+        self._rendered = (self._version, embed, embed.to_dict())
+        return embed
+    
+    # true if the message already shows this embed, so an edit would be a no-op
+    def is_sent(self, embed: discord.Embed):
+        if self._rendered is not None and self._rendered[1] is embed:
+            return self._rendered[2] == self._last_sent
+        return embed.to_dict() == self._last_sent
+    
+    def mark_sent(self, embed: discord.Embed):
+        if self._rendered is not None and self._rendered[1] is embed:
+            self._last_sent = self._rendered[2]
+        else:
+            self._last_sent = embed.to_dict()
+    
+    # the group message, rebuilt from its IDs: editable without a cached channel or message
+    def partial_message(self):
+        if self.message_id is None or self.channel_id is None:
+            return None
+        channel = get_bot().bot.get_partial_messageable(self.channel_id, guild_id=self.guild_id)
+        return channel.get_partial_message(self.message_id)
+    
+    # edit the group message with the current state, skipping the REST call if nothing visible changed
+    async def refresh_message(self):
+        message = self.partial_message()
+        if message is None or self.is_closed:
+            return False
+        embed = self.update_embed()
+        if self.is_sent(embed):
+            return False
+        await message.edit(embed=embed)  # the buttons never change while the group is open
+        self.mark_sent(embed)
+        return True
+    
+    def _build_embed(self):
+        filled_slots = [slot for slot in self.slots if slot]
+        filled_count = len(filled_slots)
         remaining_count = 5 - filled_count
+        is_full = remaining_count == 0
         
-        progress_bar = ""
-        for i in range(5):
-            if i < filled_count:
-                progress_bar += "✅"
-            else:
-                progress_bar += "⬜"
+        progress_bar = "✅" * filled_count + "⬜" * remaining_count
         
-        if self.is_full():
+        if is_full:
             color = discord.Color.green()
             title = f"🎉 5 MAN GROUP - FULL! {progress_bar} {filled_count}/5"
         else:
@@ -73,49 +260,38 @@ class FiveManView(discord.ui.View):
         embed = discord.Embed(title=title, color=color)
         
         description = ""
-        filled_slots = [slot for slot in self.slots if slot]
         if filled_slots:
+            role_emojis = get_bot().guild_metadata.lane_emojis(self.guild_id)
             description += "**Joined Players:**\n"
             for slot in filled_slots:
-                # try to get user mention; if not found, fallback to username
-                try:
-                    user = bot.get_user(slot["user_id"])
-                    user_mention = user.mention if user else f"<@{slot['user_id']}>"
-                except:
-                    user_mention = slot.get("username", f"<@{slot['user_id']}>")
+                user_mention = f"<@{slot.user_id}>"
                 
                 # include emoji if found, else don't show emoji
                 role_text = ""
-                if slot.get("role"):
-                    role_emoji_ids = {
-                        "Top": "<:top_lane:1403834039735025674>",
-                        "Jungle": "<:jungle:1403834034957713691>", 
-                        "Mid": "<:mid_lane:1403834037776154785>",
-                        "ADC": "<:bot_lane:1403834041010098246>",
-                        "Support": "<:support:1403834038694973521>",
-                        "Fill": "<:fill:1403834036866125884>",
-                    }
-                    
-                    role_emoji = ""
-                    emoji_name = role_emoji_ids.get(slot["role"])
-                    if emoji_name:
-                        instance = get_bot()
-                        guild = instance.bot.get_guild(self.guild_id)
-                        if guild:
-                            emoji = discord.utils.get(guild.emojis, name=emoji_name)
-                            if emoji:
-                                role_emoji = str(emoji) + " "
-                    role_text = f" **{role_emoji}{slot['role']}**"
-                time_text = f" - *{slot['time']}*" if slot['time'] else ""
+                if slot.role:
+                    role_text = f" **{role_emojis[slot.role.label]} {slot.role.label}**"
+                time_text = f" - *{slot.time}*" if slot.time else ""
                 description += f"• {user_mention}{role_text}{time_text}\n"
             description += "\n"
         
+        window = self.common_availability()
+        if window:
+            # <t:...> renders in each viewer's own time zone
+            description += f"🕒 **Everyone free:** <t:{int(window[0])}:t> – <t:{int(window[1])}:t> (<t:{int(window[0])}:R>)\n\n"
+        elif window is False:
+            description += "🕒 **No common time yet** - the entered times don't overlap\n\n"
+        
         if remaining_count > 0:
-            description += f"**Remaining Slots:** {remaining_count} (Open)\n"
+            reserved = min(self.reserved_count(), remaining_count)
+            if reserved:
+                description += f"**Remaining Slots:** {remaining_count} ({reserved} reserved, {remaining_count - reserved} open)\n"
+                description += f"⏳ {reserved} player(s) picking a role\n"
+            else:
+                description += f"**Remaining Slots:** {remaining_count} (Open)\n"
         
         embed.description = description.strip()
         
-        if self.is_full():
+        if is_full:
             embed.add_field(
                 name="🎮 GROUP FULL!", 
                 value="All 5 slots filled!", 
@@ -124,4 +300,4 @@ class FiveManView(discord.ui.View):
         else:
             embed.set_footer(text="Click 'Join' button below to join!")
         
-        return embed
\ No newline at end of file
+        return embed
@@ -0,0 +1,26 @@
+import discord
+
+from ui.SlotButton import SlotButton
+from ui.ResetButton import ResetButton
+from ui.LeaveButton import LeaveButton
+from ui.CloseButton import CloseButton
+
+
+# the buttons under every group message; one persistent instance (registered by the Session cog) handles clicks
+# on all of them, and each button looks its group up by interaction.message.id in the GroupRegistry
+class GroupRouterView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+        self.add_item(SlotButton())
+        self.add_item(ResetButton())
+        self.add_item(LeaveButton())
+        self.add_item(CloseButton())
+
+    # the components to send or edit onto a group message: stopped, so discord.py doesn't store a view per message
+    @classmethod
+    def rendered(cls, disabled: bool = False):
+        view = cls()
+        for item in view.children:
+            item.disabled = disabled
+        view.stop()
+        return view
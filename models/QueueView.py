@@ -0,0 +1,31 @@
+import discord
+
+from ui.QueueButton import QueueButton
+from ui.LeaveQueueButton import LeaveQueueButton
+
+
+# the queue panel: stateless (the queue lives in Matchmaker), so one persistent instance serves every panel message
+class QueueView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+        self.add_item(QueueButton())
+        self.add_item(LeaveQueueButton())
+    
+    # the components to send with a panel message: stopped, so discord.py doesn't store a view per /queue
+    @classmethod
+    def rendered(cls):
+        view = cls()
+        view.stop()
+        return view
+    
+    @staticmethod
+    def build_embed():
+        return discord.Embed(
+            title="🎲 FiveStack Queue",
+            description=(
+                "Queue with your preferred role (or Fill) and the bot forms complete groups "
+                "with one Top, Jungle, Mid, ADC and Support as soon as enough players are waiting.\n\n"
+                "Matched groups are posted in this channel and ping their players."
+            ),
+            color=discord.Color.blurple(),
+        )
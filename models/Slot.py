@@ -0,0 +1,91 @@
+from enum import IntEnum
+
+
+class Role(IntEnum):
+    TOP = 1
+    JUNGLE = 2
+    MID = 3
+    ADC = 4
+    SUPPORT = 5
+    FILL = 6
+
+    @property
+    def label(self):
+        return ROLE_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label):
+        """Role for a RoleSelect label ("Top", "ADC", ...), or None"""
+        if label is None:
+            return None
+        return _ROLES_BY_LABEL.get(label)
+
+
+ROLE_LABELS = {
+    Role.TOP: "Top",
+    Role.JUNGLE: "Jungle",
+    Role.MID: "Mid",
+    Role.ADC: "ADC",
+    Role.SUPPORT: "Support",
+    Role.FILL: "Fill",
+}
+_ROLES_BY_LABEL = {label: role for role, label in ROLE_LABELS.items()}
+
+# lane emojis from the FiveStack server; guilds with their own emojis of the same name use those in embeds
+ROLE_EMOJIS = {
+    Role.TOP: "<:top_lane:1403834039735025674>",
+    Role.JUNGLE: "<:jungle:1403834034957713691>",
+    Role.MID: "<:mid_lane:1403834037776154785>",
+    Role.ADC: "<:bot_lane:1403834041010098246>",
+    Role.SUPPORT: "<:support:1403834038694973521>",
+    Role.FILL: "<:fill:1403834036866125884>",
+}
+
+
+class Slot:
+    """One seated player. Treated as immutable: slot changes replace the record"""
+
+    __slots__ = ("user_id", "username", "time", "role")
+
+    def __init__(self, user_id: int, username: str = None, time: str = None, role: Role = None):
+        self.user_id = user_id
+        self.username = username
+        self.time = time
+        self.role = role
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a slot from its JSON form (role stored by label, as in older session files)"""
+        role = data.get("role")
+        return cls(
+            data["user_id"],
+            data.get("username"),
+            data.get("time"),
+            Role.from_label(role) if isinstance(role, str) else (Role(role) if role else None),
+        )
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "username": self.username,
+            "time": self.time,
+            "role": self.role.label if self.role else None,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Slot):
+            return NotImplemented
+        return (self.user_id, self.username, self.time, self.role) == (other.user_id, other.username, other.time, other.role)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Slot(user_id={self.user_id}, role={self.role.label if self.role else None}, time={self.time!r})"
+
+
+def slots_to_json(slots):
+    return [slot.to_dict() if slot else None for slot in slots]
+
+
+def slots_from_json(data):
+    return [Slot.from_dict(slot) if slot else None for slot in data]
@@ -0,0 +1,51 @@
+import time
+
+
+class SlotReservations:
+    """Slots held for players between Join and the TimeModal submit.
+
+    A hold expires after `ttl` seconds on the monotonic clock (the event loop's
+    clock), so wall clock changes don't stretch or cut holds. Checks and inserts
+    never await, so on the event loop `reserve` is atomic: a group never promises
+    more players than it has open slots.
+    """
+
+    __slots__ = ("ttl", "_holds")
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._holds = {}  # user_id -> expiry, time.monotonic()
+
+    def __len__(self):
+        return len(self._holds)
+
+    def prune(self, now: float = None):
+        """Drop expired holds; returns True if any were dropped"""
+        now = time.monotonic() if now is None else now
+        expired = [user_id for user_id, expires_at in self._holds.items() if expires_at <= now]
+        for user_id in expired:
+            del self._holds[user_id]
+        return bool(expired)
+
+    def next_expiry(self):
+        """When the earliest hold runs out (time.monotonic()), or None without holds"""
+        return min(self._holds.values(), default=None)
+
+    def holds(self, user_id: int):
+        expires_at = self._holds.get(user_id)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def others(self, user_id: int):
+        """Live holds by anyone but this player"""
+        now = time.monotonic()
+        return sum(1 for holder, expires_at in self._holds.items() if holder != user_id and expires_at > now)
+
+    def reserve(self, user_id: int, open_slots: int):
+        """Hold (or extend) a slot for the player if one is free; returns True on success"""
+        if self.others(user_id) >= open_slots:
+            return False
+        self._holds[user_id] = time.monotonic() + self.ttl
+        return True
+
+    def release(self, user_id: int):
+        return self._holds.pop(user_id, None) is not None
@@ -3,6 +3,8 @@
 import discord
 
 from models import FiveManView
+from bot.Metrics import timed
+from bot.instance import get_bot
 
 
 class CloseButton(discord.ui.Button):
@@ -14,8 +16,10 @@ class CloseButton(discord.ui.Button):
             custom_id="close_button"
         )
     
+    @timed("component")
     async def callback(self, interaction: discord.Interaction):
-        view: FiveManView = self.view
+        # the shared GroupRouterView serves every group message; find this one's group
+        view: FiveManView = get_bot().groups.for_message(interaction.message)
         # print(f"=== CLOSE GROUP BUTTON CALLBACK DEBUG ===")
         # print(f"User: {interaction.user.id}")
         # print(f"Guild: {interaction.guild_id}")
@@ -25,24 +29,23 @@ class CloseButton(discord.ui.Button):
         # print(f"View closed: {view.is_closed}")
         
         try:
-            if view.is_closed:
+            if view is None or view.is_closed:
                 await interaction.response.send_message("❌ This group is already closed.", ephemeral=True)
                 return
             
             view.close_group()
             
-            # disable all buttons
-            for item in view.children:
-                item.disabled = True
-            
             embed = discord.Embed(
                 title="🔒 FiveStack Group - Closed",
                 description="This group has been closed by the organizer.",
                 color=discord.Color.red()
             )
             
-            await interaction.response.edit_message(embed=embed, view=view)
+            # disable all buttons (after any refresh still being sent, or it would overwrite the closed embed)
+            await get_bot().edit_coalescer.settle(view)
+            await interaction.response.edit_message(embed=embed, view=view.components(disabled=True))
             await interaction.followup.send("🔒 Group has been closed. A new group can now be created.", ephemeral=True)
+            await get_bot().state.delete(view.message_id)
             
         except Exception as e:
             print(f"Error in CloseGroupButton callback: {e}")
@@ -1,6 +1,8 @@
 import discord
 
 from models import FiveManView
+from bot.Metrics import timed
+from bot.instance import get_bot
 
 
 class LeaveButton(discord.ui.Button):
@@ -12,8 +14,10 @@ class LeaveButton(discord.ui.Button):
             custom_id="leave_button"
         )
     
+    @timed("component")
     async def callback(self, interaction: discord.Interaction):
-        view: FiveManView = self.view
+        # the shared GroupRouterView serves every group message; find this one's group
+        view: FiveManView = get_bot().groups.for_message(interaction.message)
         # print(f"=== LEAVE BUTTON CALLBACK DEBUG ===")
         # print(f"User: {interaction.user.id}")
         # print(f"Guild: {interaction.guild_id}")
@@ -23,26 +27,26 @@ class LeaveButton(discord.ui.Button):
         # print(f"View closed: {view.is_closed}")
             
         try:
-            if view.is_closed:
+            if view is None or view.is_closed:
                 await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
                 return
             
-            user_slot_index = None
-            for i, slot in enumerate(view.slots):
-                if slot and slot["user_id"] == interaction.user.id:
-                    user_slot_index = i
-                    break
+            user_slot_index, slots = await get_bot().state.release_slot(view.message_id, interaction.user.id)
+            if slots is None:  # the shared state dropped it: closed or expired on another replica
+                view.close_group()
+                await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
+                return
+            view.apply_slots(slots)
             
             if user_slot_index is None:
                 await interaction.response.send_message("❌ You're not in this group.", ephemeral=True)
                 return
             
-            view.slots[user_slot_index] = None
-            
-            embed = view.update_embed()
-            await interaction.response.edit_message(embed=embed, view=view)
+            get_bot().group_store.record(view)
             
-            await interaction.followup.send("👋 You've left the group!", ephemeral=True)
+            # acknowledge right away; the group message edit is coalesced
+            await interaction.response.send_message("👋 You've left the group!", ephemeral=True)
+            get_bot().edit_coalescer.mark_dirty(view)
             
         except Exception as e:
             print(f"❌ Exception in LeaveButton callback: {e}")
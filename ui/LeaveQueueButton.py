@@ -0,0 +1,21 @@
+import discord
+
+from bot.Metrics import timed
+from bot.instance import get_bot
+
+
+class LeaveQueueButton(discord.ui.Button):
+    def __init__(self):
+        super().__init__(
+            label="Leave Queue",
+            style=discord.ButtonStyle.secondary,
+            emoji="🚪",
+            custom_id="queue_leave_button"
+        )
+    
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        if get_bot().matchmaker.dequeue(interaction.guild_id, interaction.user.id):
+            await interaction.response.send_message("👋 You've left the queue.", ephemeral=True)
+        else:
+            await interaction.response.send_message("❌ You're not in the queue.", ephemeral=True)
@@ -0,0 +1,44 @@
+import discord
+
+from bot.Metrics import timed
+from bot.instance import get_bot
+from ui.RoleSelect import RoleSelect
+
+
+class QueueButton(discord.ui.Button):
+    def __init__(self):
+        super().__init__(
+            label="Queue",
+            style=discord.ButtonStyle.primary,
+            emoji="🎲",
+            custom_id="queue_join_button"
+        )
+    
+    @timed("component")
+    async def callback(self, interaction: discord.Interaction):
+        try:
+            groups = get_bot().groups.groups_of(interaction.guild_id, interaction.user.id)
+            if groups:
+                await interaction.response.send_message(
+                    f"❗ You're already in a group in this server: {groups[0].jump_url}\n"
+                    "Use its 'Leave' button first to queue.",
+                    ephemeral=True
+                )
+                return
+            
+            # same role menu as Join; in queue mode picking a role queues the player
+            position = get_bot().matchmaker.position(interaction.guild_id, interaction.user.id)
+            if position is not None:
+                prompt = (f"ℹ️ You're already queued (position {position}). "
+                          "Picking a role below changes it and moves you to the back of the queue:")
+            else:
+                prompt = "Please select your League of Legends role to queue (Fill takes any open lane):"
+            await interaction.response.send_message(
+                prompt,
+                view=RoleSelect.menu("queue"),
+                ephemeral=True
+            )
+        except Exception as e:
+            print(f"Error in QueueButton callback: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
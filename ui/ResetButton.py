@@ -3,6 +3,8 @@
 import discord
 
 from models import FiveManView
+from bot.Metrics import timed
+from bot.instance import get_bot
 
 
 class ResetButton(discord.ui.Button):
@@ -14,8 +16,10 @@ class ResetButton(discord.ui.Button):
             custom_id="reset_button"
         )
     
+    @timed("component")
     async def callback(self, interaction: discord.Interaction):
-        view: FiveManView = self.view
+        # the shared GroupRouterView serves every group message; find this one's group
+        view: FiveManView = get_bot().groups.for_message(interaction.message)
         # print(f"=== RESET BUTTON CALLBACK DEBUG ===")
         # print(f"User: {interaction.user.id}")
         # print(f"Guild: {interaction.guild_id}")
@@ -25,16 +29,22 @@ class ResetButton(discord.ui.Button):
         # print(f"View closed: {view.is_closed}")
         
         try:
-            if view.is_closed:
+            if view is None or view.is_closed:
                 await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
                 return
             
             # reset slots
-            view.slots = [None] * 5
+            slots = await get_bot().state.reset(view.message_id)
+            if slots is None:  # the shared state dropped it: closed or expired on another replica
+                view.close_group()
+                await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
+                return
+            view.apply_slots(slots)
+            get_bot().group_store.record(view)
     
-            embed = view.update_embed()
-            await interaction.response.edit_message(embed=embed, view=view)
-            await interaction.followup.send("🔄 All slots have been reset!", ephemeral=True)           
+            # acknowledge right away; the coalesced edit is skipped if the group was already empty
+            await interaction.response.send_message("🔄 All slots have been reset!", ephemeral=True)
+            get_bot().edit_coalescer.mark_dirty(view)
         except Exception as e:
             print(f"Error in ResetButton callback: {e}")
             if not interaction.response.is_done():
@@ -0,0 +1,27 @@
+import discord
+
+from bot.Metrics import timed
+from bot.instance import get_bot
+
+
+# "Cancel" under the role menu; gives the slot held since Join back to the group
+class RoleCancelButton(discord.ui.DynamicItem[discord.ui.Button], template=r"fivestack:role_cancel:(?P<target>queue|[0-9]+)"):
+    def __init__(self, target: str):
+        super().__init__(discord.ui.Button(
+            label="Cancel",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"fivestack:role_cancel:{target}",
+        ))
+        self.target = target
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["target"])
+
+    @timed("component", "role_cancel")
+    async def callback(self, interaction: discord.Interaction):
+        if self.target != "queue":
+            group = get_bot().groups.get(int(self.target))
+            if group is not None and group.release_reservation(interaction.user.id):
+                get_bot().edit_coalescer.mark_dirty(group)
+        await interaction.response.edit_message(content="Cancelled.", view=None)
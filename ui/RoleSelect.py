@@ -1,31 +1,61 @@
-
-
 import discord
 
 from ui.TimeModal import TimeModal
+from ui.RoleCancelButton import RoleCancelButton
+from bot.Metrics import timed
+from bot.instance import get_bot
+from models.Slot import ROLE_EMOJIS, Role, Slot
+
+
+# the role menu for a group ("fivestack:role:<message id>") or for the matchmaking queue ("fivestack:role:queue");
+# everything else comes from the interaction, so nothing is kept per click and menus survive a restart
+class RoleSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"fivestack:role:(?P<target>queue|[0-9]+)"):
+    def __init__(self, target: str):
+        super().__init__(discord.ui.Select(
+            custom_id=f"fivestack:role:{target}",
+            placeholder="Select your preferred role",
+            min_values=1,
+            max_values=1,
+            options=[discord.SelectOption(label=role.label, emoji=emoji) for role, emoji in ROLE_EMOJIS.items()]
+        ))
+        self.target = target
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(match["target"])
+
+    # the ephemeral message view: stopped, so discord.py doesn't store it (the registered dynamic items handle clicks)
+    @staticmethod
+    def menu(target):
+        view = discord.ui.View(timeout=None)
+        view.add_item(RoleSelect(str(target)))
+        view.add_item(RoleCancelButton(str(target)))
+        view.stop()
+        return view
 
+    @timed("component", "role_select", defer=False)  # may answer with TimeModal, which can't follow a deferral
+    async def callback(self, interaction: discord.Interaction):
+        selected_role = self.item.values[0]
+        user = interaction.user
+        if self.target == "queue":
+            position = get_bot().matchmaker.enqueue(interaction.guild_id, interaction.channel, Slot(
+                user.id, user.display_name, None, Role.from_label(selected_role)
+            ))
+            await interaction.response.edit_message(
+                content=f"✅ Queued as **{selected_role}** (position {position}). You'll be pinged when your group is ready.",
+                view=None
+            )
+            return
 
-class RoleSelect(discord.ui.View):
-    def __init__(self, user, parent_view):
-        super().__init__(timeout=60)
-        self.user = user
-        self.parent_view = parent_view
-        self.selected_role = None
-    
-    @discord.ui.select(
-        placeholder="Select your preferred role",
-        min_values=1,
-        max_values=1,
-        options=[
-            discord.SelectOption(label="Top", emoji="<:top_lane:1403834039735025674>"),
-            discord.SelectOption(label="Jungle", emoji="<:jungle:1403834034957713691>"),
-            discord.SelectOption(label="Mid", emoji="<:mid_lane:1403834037776154785>"),
-            discord.SelectOption(label="ADC", emoji="<:bot_lane:1403834041010098246>"),
-            discord.SelectOption(label="Support", emoji="<:support:1403834038694973521>"),
-            discord.SelectOption(label="Fill", emoji="<:fill:1403834036866125884>"),
-        ]
-    )
-    async def select_callback(self, interaction: discord.Interaction, select: discord.ui.Select):
-        self.selected_role = select.values[0]
-        await interaction.response.send_modal(TimeModal(self.user, self.parent_view, self.selected_role))
-        self.stop()
\ No newline at end of file
+        group = get_bot().groups.get(int(self.target))
+        if group is None or group.is_closed:
+            await interaction.response.edit_message(content="❌ This group has been closed.", view=None)
+        elif not group.reserve_slot(user.id):
+            # the hold from Join ran out and the open slots went to other players
+            await interaction.response.edit_message(
+                content="⏳ Your slot reservation expired and every open slot is held by other players. Click Join to try again.",
+                view=None
+            )
+        else:
+            # renewed above, so the hold lasts while the modal is open
+            await interaction.response.send_modal(TimeModal.build(group.message_id, Role.from_label(selected_role)))
@@ -2,6 +2,8 @@
 import discord
 
 from models import FiveManView
+from bot.Metrics import timed
+from bot.instance import get_bot
 from ui.RoleSelect import RoleSelect
 
 
@@ -14,8 +16,10 @@ class SlotButton(discord.ui.Button):
             custom_id="join_slot_button"
         )
     
+    @timed("component")
     async def callback(self, interaction: discord.Interaction):
-        view: FiveManView = self.view
+        # the shared GroupRouterView serves every group message; find this one's group
+        view: FiveManView = get_bot().groups.for_message(interaction.message)
         # print(f"=== SLOT BUTTON CALLBACK DEBUG ===")
         # print(f"User: {interaction.user.id}")
         # print(f"Guild: {interaction.guild_id}")
@@ -25,10 +29,13 @@ class SlotButton(discord.ui.Button):
         # print(f"View closed: {view.is_closed}")
         
         try:
-            if view.is_closed:
+            if view is None or view.is_closed:
                 await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
                 return
             
+            # another replica may have changed the group since we last looked
+            await view.sync_state()
+            
             if view.is_user_already_joined(interaction.user):
                 await interaction.response.send_message(
                     f"❗ You're already in the group. Use 'Leave' button first to update your availability.",
@@ -40,14 +47,34 @@ class SlotButton(discord.ui.Button):
                 await interaction.response.send_message("❌ The group is currently full.", ephemeral=True)
                 return
             
+            # one group per player per server
+            other_groups = get_bot().groups.groups_of(interaction.guild_id, interaction.user.id)
+            if other_groups:
+                await interaction.response.send_message(
+                    f"❗ You're already in another group in this server: {other_groups[0].jump_url}\n"
+                    "Use its 'Leave' button first to join this one.",
+                    ephemeral=True
+                )
+                return
+            
+            # hold a slot through RoleSelect and TimeModal so the player can't lose it to the rush
+            if not view.reserve_slot(interaction.user.id):
+                await interaction.response.send_message(
+                    "⏳ Every open slot is held by players picking a role right now. Try again in a minute.",
+                    ephemeral=True
+                )
+                return
+            get_bot().edit_coalescer.mark_dirty(view)
+            
             # RoleSelectView first, then open TimeModal to avoid answering same interaction twice
-            role_select_view = RoleSelect(user=interaction.user, parent_view=view)
             await interaction.response.send_message(
                 "Please select your League of Legends role first:",
-                view=role_select_view,
+                view=RoleSelect.menu(view.message_id),
                 ephemeral=True
             )
         except Exception as e:
             print(f"Error in SlotButton callback: {e}")
+            if view is not None and view.release_reservation(interaction.user.id):
+                get_bot().edit_coalescer.mark_dirty(view)
             if not interaction.response.is_done():
                 await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
\ No newline at end of file
@@ -1,41 +1,109 @@
+import re
+
 import discord
 
+from bot.instance import get_bot
+from bot.Metrics import timed
+from models.Slot import Role, Slot
+from models.Availability import parse_availability
+
+
+# "fivestack:time:<group message id>:<role>"
+CUSTOM_ID = re.compile(r"fivestack:time:(?P<message_id>[0-9]+):(?P<role>[0-9]+)")
+
+
 class TimeModal(discord.ui.Modal, title="Join Slot"):
     time_input = discord.ui.TextInput(
         label="When are you available? (Optional)",
         required=False,
         placeholder="e.g. 7PM to 9PM EST, now, etc.",
-        max_length=100
+        max_length=100,
+        custom_id="time_input"  # fixed, so submits still resolve after a restart
     )
     
-    def __init__(self, user, view, role):
-        super().__init__()
-        self.user = user
-        self.view_ref = view
-        self.selected_role = role
+    def __init__(self, message_id: int, role: Role):
+        super().__init__(timeout=None, custom_id=f"fivestack:time:{message_id}:{int(role)}")
+        self.message_id = message_id
+        self.role = role
+        self.selected_role = role.label
+        self.user = None  # set from the submitting interaction
+        self.view_ref = None
     
+    # the modal to send: stopped, so discord.py doesn't keep it; submits come back through from_interaction
+    @classmethod
+    def build(cls, message_id: int, role: Role):
+        modal = cls(message_id, role)
+        modal.stop()
+        return modal
+    
+    # rebuild the modal for a submit (the Session cog's on_interaction listener), None if it isn't one of ours
+    @classmethod
+    def from_interaction(cls, interaction: discord.Interaction):
+        match = CUSTOM_ID.fullmatch((interaction.data or {}).get("custom_id", ""))
+        if match is None or int(match["role"]) not in Role._value2member_map_:
+            return None
+        modal = cls(int(match["message_id"]), Role(int(match["role"])))
+        modal._refresh(interaction, interaction.data.get("components") or [])
+        return modal
+    
+    # give the slot held since Join back to the group
+    def _release(self):
+        if self.view_ref is not None and self.view_ref.release_reservation(self.user.id):
+            get_bot().edit_coalescer.mark_dirty(self.view_ref)
+    
+    @timed("modal", "time_modal")
     async def on_submit(self, interaction: discord.Interaction):
+        self.user = interaction.user
+        self.view_ref = get_bot().groups.get(self.message_id)
         try:
-            available_slot_index = self.view_ref.get_first_available_slot()
-            if available_slot_index is None:
+            if self.view_ref is None or self.view_ref.is_closed:
+                await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
+                return
+            
+            # joined another group while this modal was open
+            if any(group is not self.view_ref for group in get_bot().groups.groups_of(interaction.guild_id, self.user.id)):
+                await interaction.response.send_message("❗ You're already in another group in this server.", ephemeral=True)
+                return
+            
+            # a player whose hold expired only gets a slot nobody else is holding
+            if not self.view_ref.can_claim(self.user.id):
                 await interaction.response.send_message(
-                    "❌ No available slots found. The group might have just filled.",
+                    "⏳ Your slot reservation expired and the open slots are held by other players. Click Join to try again.",
                     ephemeral=True
                 )
                 return
             
-            self.view_ref.slots[available_slot_index] = {
-                "user_id": self.user.id,
-                "username": self.user.display_name,
-                "time": self.time_input.value.strip() if self.time_input.value else None,
-                "role": self.selected_role
-            }
+            # claim through the state backend so concurrent joins (even on other replicas) never share a slot
+            available_slot_index, slots = await get_bot().state.claim_slot(self.view_ref.message_id, Slot(
+                self.user.id,
+                self.user.display_name,
+                self.time_input.value.strip() if self.time_input.value else None,
+                self.role,
+            ))
+            if slots is None:  # the shared state dropped it: closed or expired on another replica
+                self.view_ref.close_group()
+                await interaction.response.send_message("❌ This group has been closed.", ephemeral=True)
+                return
+            self.view_ref.apply_slots(slots)
+            # only the claim that took the last slot announces the full group (concurrent joins may finish later)
+            filled_group = available_slot_index is not None and all(slots)
+            if available_slot_index is None:
+                if self.view_ref.is_user_already_joined(self.user):
+                    message = "❗ You're already in the group. Use 'Leave' button first to update your availability."
+                else:
+                    message = "❌ No available slots found. The group might have just filled."
+                await interaction.response.send_message(message, ephemeral=True)
+                return
             
-            embed = self.view_ref.update_embed()
+            get_bot().group_store.record(self.view_ref)
             
             details = []
             if self.time_input.value:
-                details.append(f"availability: {self.time_input.value}")
+                interval = parse_availability(self.time_input.value)
+                if interval is not None:
+                    details.append(f"availability: <t:{int(interval[0])}:t> – <t:{int(interval[1])}:t>")
+                else:
+                    details.append(f"availability: {self.time_input.value} (couldn't read a time, so it won't count toward the group's common window)")
             if self.selected_role:
                 details.append(f"role: {self.selected_role}")
             detail_msg = " with " + ", ".join(details) if details else ""
@@ -43,18 +111,17 @@ class TimeModal(discord.ui.Modal, title="Join Slot"):
             await interaction.response.send_message(f"✅ Joined the group{detail_msg}!", ephemeral=True)
             
             # edit ORIGINAL message, NOT the interaction; that will cause the ephemeral to have the updated view
-            if hasattr(self.view_ref, 'original_message') and self.view_ref.original_message:
-                await self.view_ref.original_message.edit(embed=embed, view=self.view_ref)
-            
-            if self.view_ref.is_full():
-                user_ids = [slot["user_id"] for slot in self.view_ref.slots if slot]
-                mentions = " ".join([f"<@{user_id}>" for user_id in user_ids])
-                # send the "group full" message to the channel (not ephemeral)
-                await self.view_ref.original_message.channel.send(
-                    f"🎉 **GROUP IS FULL!** {mentions}\nYour 5-man is ready to go! Coordinate and have fun! 🎮"
-                )
+            # (coalesced so a burst of joins becomes a single edit)
+            get_bot().edit_coalescer.mark_dirty(self.view_ref)
+            
+            if filled_group:
+                # "group full" ping (and DMs) go out from the notifier, not this handler
+                get_bot().notifier.group_ready(self.view_ref)
                 
         except Exception as e:
             print(f"Error in TimeModal on_submit: {e}")
             if not interaction.response.is_done():
-                await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
\ No newline at end of file
+                await interaction.response.send_message("❌ An error occurred. Please try again.", ephemeral=True)
+        finally:
+            # joined or not, the hold from Join is used up
+            self._release()
\ No newline at end of file